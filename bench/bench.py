@@ -0,0 +1,50 @@
+import multiprocessing as mp
+import resource
+import time
+import torch
+
+def timeit(f, *args, n=100, warmup=5):
+    """ Average wall time of `f(*args)` in seconds. """
+    for k in range(warmup):
+        f(*args)
+    t0 = time.perf_counter()
+    for k in range(n):
+        f(*args)
+    return (time.perf_counter() - t0) / n
+
+def nbytes(*ts):
+    """ Storage of (sparse) tensors in bytes. """
+    total = 0
+    for t in ts:
+        if t.layout == torch.sparse_coo:
+            total += nbytes(t._indices(), t._values())
+        elif t.layout == torch.sparse_csr:
+            total += nbytes(t.crow_indices(), t.col_indices(), t.values())
+        else:
+            total += t.numel() * t.element_size()
+    return total
+
+def show(*cols, width=14):
+    """ Print a row of aligned columns. """
+    fmt = lambda c: (f'{c:.3e}' if isinstance(c, float) else str(c))
+    print(''.join(fmt(c).rjust(width) for c in cols))
+
+def _peak(f, args, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    f(*args)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put(1024 * (after - before))
+
+def peak_memory(f, *args):
+    """ 
+    Peak resident memory increase of `f(*args)` in bytes.
+
+    The call is run in a forked process so that measures are independent.
+    Returns None if the process failed, e.g. when running out of memory.
+    """
+    ctx = mp.get_context('fork')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_peak, args=(f, args, queue))
+    proc.start()
+    proc.join()
+    return queue.get() if proc.exitcode == 0 else None
@@ -0,0 +1,31 @@
+""" 
+Throughput of batched belief diffusions on Ising lattices.
+
+Integrates ensembles of B energies at once, so that every operator
+is applied by a single sparse matrix product per step. Reports 
+models per second for the `Diffusion.euler` integrator on batched 
+fields and for the eager tensor step of `Diffusion.compiled`.
+
+    $ cd bench && python bench_batch.py
+"""
+import bench
+import torch
+
+from topos.bp import IsingNetwork, BetheDiffusion, GBPDiffusion
+
+dt, steps = 0.1, 10
+
+bench.show('diffusion', 'n', 'batch', 'smooth (/s)', 'eager (/s)')
+
+for Diff in [BetheDiffusion, GBPDiffusion]:
+    for n in [8, 32]:
+        N = IsingNetwork.lattice(2, n)
+        X = Diff(N, 1.)
+        smooth = X.euler(dt, steps)
+        eager = X.compiled(dt, steps, backend=None)
+        for B in [1, 8, 64, 256]:
+            hs = torch.randn([B, N[0].size])
+            Hs = N.field(hs, 0)
+            bench.show(Diff.__name__, n, B,
+                       B / bench.timeit(smooth, Hs, n=10),
+                       B / bench.timeit(eager, hs, n=10))
@@ -0,0 +1,30 @@
+""" 
+COO vs CSR matvec throughput on Ising lattice operators.
+
+    $ cd bench && python bench_csr.py
+"""
+import bench
+import torch
+
+from topos.core import sparse
+from topos.bp   import IsingNetwork
+
+sizes = [8, 16, 32, 64]
+
+bench.show('size', 'op', 'nnz', 'coo (s)', 'csr (s)', 'speedup')
+
+for n in sizes:
+    N = IsingNetwork.lattice(2, n)
+    ops = {
+        'zeta'  : N.zeta(0),
+        'mu'    : N.mu(0),
+        'd'     : N.diff(0),
+        'face0' : N.face0(),
+        'face1' : N.face1(),
+    }
+    for name, op in ops.items():
+        x = torch.randn([op.data.shape[1]])
+        A = op.data
+        t_coo = bench.timeit(lambda: sparse.matmul(A, x[:,None]))
+        t_csr = bench.timeit(op.matvec, x)
+        bench.show(n, name, A._nnz(), t_coo, t_csr, f'{t_coo / t_csr:.1f}')
@@ -0,0 +1,26 @@
+""" 
+Sparse Fourier matrices vs FFT operators on square tori.
+
+    $ cd bench && python bench_fft.py
+"""
+import bench
+import torch
+
+from topos.core import sparse, Shape, FFT
+
+# sparse matrices have N ** 2 nonzeros
+max_sparse = 2 ** 24
+
+bench.show('shape', 'sparse (B)', 'sparse (s)', 'fft (s)')
+
+for n in [8, 16, 32, 64, 128]:
+    F = FFT(Shape(n, n))
+    x = torch.randn([F.size])
+    t_fft = bench.timeit(F.matvec, x)
+    if F.size ** 2 <= max_sparse:
+        A = F.to_sparse()
+        m_sp = bench.nbytes(A)
+        t_sp = bench.timeit(sparse.matvec, A, x, n=10, warmup=1)
+    else:
+        m_sp, t_sp = '-', '-'
+    bench.show(f'{n}x{n}', m_sp, t_sp, t_fft)
@@ -0,0 +1,58 @@
+""" 
+Memory and time of sparse.index_select on a star-plus-lattice graph.
+
+The hub vertex is adjacent to every lattice vertex, so that the former
+padded edge table had (number of rows) x (hub degree) entries.
+
+    $ cd bench && python bench_index_select.py
+"""
+import bench
+import torch
+
+from topos.core import sparse
+
+def star_lattice(n):
+    """ Adjacency of a n x n torus lattice with an additional hub vertex. """
+    N = n * n
+    i = torch.arange(N)
+    right = (i // n) * n + (i + 1) % n
+    down  = (i + n) % N
+    hub   = torch.full([N], N)
+    src = torch.cat([i, i, hub, right, down, i])
+    tgt = torch.cat([right, down, i, i, i, hub])
+    return sparse.matrix([N + 1, N + 1], torch.stack([src, tgt]), t=False).coalesce()
+
+def index_select_padded(g, idx, dim=0):
+    """ Former implementation, through a [rows, max(deg)] edge table. """
+    indices, values = g.indices(), g.values()
+    deg_g = (torch.zeros(g.shape[dim], dtype=torch.int32)
+                  .scatter_(0, indices[dim], 1, reduce="add"))
+    query = torch.arange(g.shape[dim], dtype=torch.long)
+    slice_begin = torch.bucketize(query, indices[dim])
+    edges = (torch.arange(deg_g.max(), dtype=torch.long)
+                .unsqueeze(0)
+                .repeat(g.shape[dim], 1))
+    mask = edges < deg_g[:,None]
+    edges += slice_begin[:,None]
+    shape = [*g.shape[:dim], idx.shape[0], *g.shape[dim + 1:]]
+    val   = values[edges[idx][mask[idx]]]
+    ij    = indices[:, edges[idx][mask[idx]]]
+    ij[dim] = torch.arange(shape[dim]).repeat_interleave(deg_g[idx])
+    return torch.sparse_coo_tensor(ij, val, size=shape).coalesce()
+
+bench.show('n', 'nnz', 'padded (B)', 'ptr (B)', 'padded (s)', 'ptr (s)')
+
+# the padded table has (n * n + 1) ** 2 entries
+max_padded = 2 ** 26
+
+for n in [16, 32, 64, 128, 256, 512]:
+    A = star_lattice(n)
+    idx = torch.randint(A.shape[0], [A.shape[0] // 4])
+    m_ptr = bench.peak_memory(sparse.index_select, A, idx)
+    t_ptr = bench.timeit(sparse.index_select, A, idx, n=5, warmup=1)
+    if A.shape[0] ** 2 <= max_padded:
+        m_pad = bench.peak_memory(index_select_padded, A, idx)
+        t_pad = bench.timeit(index_select_padded, A, idx, n=5, warmup=1)
+    else:
+        m_pad, t_pad = '-', '-'
+    bench.show(n, A._nnz(), m_pad, m_ptr, t_pad, t_ptr)
@@ -0,0 +1,50 @@
+""" 
+Möbius inversion on nerves of 3- and 4-dimensional complexes.
+
+Compares the former series `Id - dz + dz^2 - ...` with ordered 
+elimination in `Nerve.mu`, and the matrix-free `Nerve.mobius` 
+with products by the matrix of mu.
+
+    $ cd bench && python bench_mu.py
+"""
+import bench
+import time
+import torch
+
+from topos import Complex, Nerve
+
+def strip(n, k):
+    """ Strip of n overlapping k-simplices [i, ..., i + k]. """
+    cells = torch.arange(n)[:,None] + torch.arange(k + 1)
+    return Complex.simplicial(cells.tolist())
+
+def series(N, d):
+    """ Former construction of mu as the alternating series. """
+    Id = N.eye(d)
+    dz1 = N.zeta(d) - Id
+    dzi, mobius = dz1, Id
+    for i in range(1, N.dim + 1):
+        mobius = mobius + (-1)**i * dzi
+        dzi = dzi @ dz1
+    return mobius
+
+def elapsed(f, *args):
+    t0 = time.perf_counter()
+    out = f(*args)
+    return time.perf_counter() - t0, out
+
+bench.show('dim', 'n', 'd', 'size', 'series (s)', 'elim (s)', 
+           'mu (B)', 'mu @ x (s)', 'solve (s)')
+
+for k in [3, 4]:
+    for n in [16, 64, 256]:
+        N = Nerve.classify(strip(n, k))
+        for d in [0, 1]:
+            N.zeta(d)
+            t_series, _ = elapsed(series, N, d)
+            t_elim, mu = elapsed(N.mu, d)
+            x = torch.randn([N[d].size])
+            t_mu = bench.timeit(mu.matvec, x)
+            t_solve = bench.timeit(N.mobius(d).matvec, x)
+            bench.show(k, n, d, N[d].size, t_series, t_elim, 
+                       bench.nbytes(mu.data), t_mu, t_solve)
@@ -0,0 +1,47 @@
+""" 
+Construction time of functor-valued quivers on Ising lattices.
+
+Compares the per-arrow loop with the vectorized construction
+of `Graph.quiver()`, and reports the total time of `Nerve.classify`.
+
+    $ cd bench && python bench_quiver.py
+"""
+import bench
+import time
+import torch
+
+from topos      import Complex, FreeFunctor, Functor, Quiver
+from topos.bp   import IsingNetwork
+
+def lattice(n):
+    """ Binary graph on the n x n torus, as in IsingNetwork.lattice. """
+    G0 = torch.arange(n * n)
+    i = torch.cat([G0, G0])
+    j = torch.cat([(G0 // n) * n + (G0 + 1) % n, (G0 + n) % (n * n)])
+    G1 = torch.stack([i, j], -1).sort(-1).values
+    G1 = G1[(n * n * G1[:,0] + G1[:,1]).sort().indices]
+    return Complex([G0, G1], FreeFunctor(2))
+
+def elapsed(f, *args):
+    t0 = time.perf_counter()
+    f(*args)
+    return time.perf_counter() - t0
+
+def quiver_loop(G):
+    """ Functor-valued quiver without the vectorized arrow map. """
+    T = G.scalars()
+    lift = Functor(lambda a: a[0] if a.dim() else a, lambda f: f)
+    return Quiver(T.quiver(), G.functor @ T.Coords @ lift)
+
+# the loop takes minutes beyond this size
+max_loop = 64
+
+bench.show('n', 'arrows', 'loop (s)', 'batch (s)', 'classify (s)')
+
+for n in [16, 32, 64, 128, 256, 512]:
+    G = lattice(n)
+    G.scalars().quiver()
+    t_loop = elapsed(quiver_loop, G) if n <= max_loop else '-'
+    t_batch = elapsed(G.quiver)
+    t_nerve = elapsed(IsingNetwork.lattice, 2, n)
+    bench.show(n, G.quiver().grades[1].shape[0], t_loop, t_batch, t_nerve)
@@ -0,0 +1,29 @@
+""" 
+Work to convergence of synchronous and prioritized diffusions.
+
+Synchronous Euler steps update every region of an Ising lattice, 
+while `Diffusion.prioritized` only updates the k regions of highest 
+residual. Work is counted in full synchronous sweeps.
+
+    $ cd bench && python bench_schedule.py
+"""
+import bench
+
+from topos.bp import IsingNetwork, GBPDiffusion
+
+dt, tol = 0.5, 1e-4
+
+bench.show('n', 'k', 'sync (sweeps)', 'prio (sweeps)', 'sync (s)', 'prio (s)')
+
+for n in [8, 16, 32]:
+    N = IsingNetwork.lattice(2, n)
+    X = GBPDiffusion(N, 1.)
+    H = N.randn(0)
+    sync = X.converge(dt, tol=tol, maxiter=10000)
+    _, info = sync(H)
+    for k in [1, 16, 64]:
+        prio = X.prioritized(dt, k)
+        _, pinfo = prio(H.data, tol=tol, maxiter=100000)
+        bench.show(n, k, info["iterations"], pinfo["sweeps"],
+                   bench.timeit(sync, H, n=1, warmup=0),
+                   bench.timeit(prio, H.data, n=1, warmup=0))
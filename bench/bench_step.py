@@ -0,0 +1,31 @@
+""" 
+Per-step cost of belief diffusions on Ising lattices.
+
+Compares the Euler step of `Diffusion.euler`, which goes through 
+`Smooth` and `Field` objects, with the tensor-level step of
+`Diffusion.compiled`, run eagerly and with `torch.compile`.
+
+    $ cd bench && python bench_step.py
+"""
+import bench
+import torch
+
+from topos.bp import IsingNetwork, BetheDiffusion, GBPDiffusion
+
+dt = 0.1
+
+bench.show('diffusion', 'n', 'cells', 'smooth (s)', 'eager (s)', 'compiled (s)')
+
+for Diff in [BetheDiffusion, GBPDiffusion]:
+    for n in [4, 8, 16, 32]:
+        N = IsingNetwork.lattice(2, n)
+        X = Diff(N, 1.)
+        H = N.randn(0)
+        smooth = X.euler(dt, 1)
+        eager = X.compiled(dt, 1, backend=None)
+        compiled = X.compiled(dt, 1)
+        compiled(H.data)
+        bench.show(Diff.__name__, n, N[0].size,
+                   bench.timeit(smooth, H),
+                   bench.timeit(eager, H.data),
+                   bench.timeit(compiled, H.data))
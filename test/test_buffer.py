@@ -0,0 +1,54 @@
+import test
+import torch
+import tempfile
+import os
+
+from topos.core import Buffer
+
+class TestBuffer(test.TestCase):
+
+    def test_ring(self):
+        B = Buffer(3)
+        for n in range(5):
+            B.append(n * torch.ones([2]), 10 * n)
+        self.assertEqual(len(B), 3)
+        self.assertClose(B.values()[:, 0], torch.tensor([2., 3., 4.]))
+        self.assertClose(B.iterations(), torch.tensor([20, 30, 40]))
+
+    def test_mmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "x.bin")
+            B = Buffer(4, path)
+            xs = torch.randn([6, 5])
+            for x in xs:
+                B.append(x)
+            self.assertEqual(os.path.getsize(path), 4 * 5 * 4)
+            stored = torch.from_file(path, size=20).view([4, 5])
+            self.assertClose(stored[B.order()], xs[2:])
+
+    def test_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "x.bin")
+            B = Buffer(4, path)
+            xs = torch.randn([6, 2, 3])
+            for n, x in enumerate(xs):
+                B.append(x, 10 * n)
+            del B
+            B = Buffer.open(path)
+            self.assertEqual(len(B), 4)
+            self.assertClose(B.values(), xs[2:])
+            self.assertClose(B.iterations(), torch.tensor([20, 30, 40, 50]))
+            # appending resumes the ring
+            B.append(xs[0], 60)
+            self.assertClose(B.values()[-1], xs[0])
+
+    def test_reopen_empty(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "x.bin")
+            Buffer(4, path)
+            B = Buffer.open(path)
+            self.assertEqual(len(B), 0)
+            self.assertEqual(B.size, 4)
+            self.assertEqual(B.values().numel(), 0)
+            B.append(torch.ones([3]), 7)
+            self.assertClose(Buffer.open(path).iterations(), torch.tensor([7]))
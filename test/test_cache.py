@@ -0,0 +1,87 @@
+import test
+import torch
+import tempfile
+
+from topos import Complex, Graph, FreeFunctor
+from topos.core import cache
+
+class TestCache (test.TestCase):
+
+    def test_persist(self):
+        F = FreeFunctor(2)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache.persist(tmp)
+            try:
+                # cold start: operators are computed and stored
+                K = Complex.simplicial([[0, 1, 2], [1, 2, 3]])
+                KF = Complex(K, F)
+                d1, L1 = KF.diff(1), KF.laplacian(1)
+                # warm start: operators are loaded from disk
+                KF2 = Complex(Complex.simplicial([[0, 1, 2], [1, 2, 3]]), F)
+                self.assertEqual(cache.fingerprint(KF), cache.fingerprint(KF2))
+                op = cache.load(KF2, "d", 1)
+                self.assertTrue(op is not None)
+                self.assertClose(d1.data.to_dense(), op.data.to_dense())
+                self.assertTrue(op.src.domain is KF2[1])
+                self.assertTrue(op.tgt.domain is KF2[2])
+                x = torch.randn([KF2[1].size])
+                self.assertClose(L1.data @ x, KF2.laplacian(1).matvec(x))
+                # distinct functor shapes yield distinct keys
+                KG = Complex(K, FreeFunctor(3))
+                self.assertTrue(cache.fingerprint(KG) != cache.fingerprint(KF))
+            finally:
+                cache.persist(None)
+
+    def test_nerve_keys(self):
+        F = FreeFunctor(2)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache.persist(tmp)
+            try:
+                # same chains of regions over distinct classified graphs
+                NA = Graph([[0], [[0, 1]]], F).nerve()
+                NB = Graph([[1], [[0, 1]]], F).nerve()
+                NA.zeta(0)
+                self.assertTrue(cache.load(NA, "zeta", 0) is not None)
+                self.assertTrue(cache.fingerprint(NA) != cache.fingerprint(NB))
+                self.assertTrue(cache.load(NB, "zeta", 0) is None)
+            finally:
+                cache.persist(None)
+
+    def test_budget(self):
+        K = Complex.simplicial([[0, 1, 2, 3], [1, 2, 3, 4]])
+        cache.reset_stats()
+        d0, d1 = K.diff(0), K.diff(1)
+        try:
+            cache.budget(cache.nbytes(d0) + cache.nbytes(d1))
+            K.diff(1)
+            K.diff(0)
+            # building d2 evicts the least recently used d1
+            K.diff(2)
+            self.assertTrue("d" in K[0]._cache)
+            self.assertTrue("d" not in K[1]._cache)
+            stats = cache.stats("d")
+            self.assertEqual(stats["misses"], 3)
+            self.assertEqual(stats["hits"], 2)
+            self.assertEqual(stats["evictions"], 1)
+            self.assertTrue(stats["time"] > 0)
+        finally:
+            cache.budget(None)
+
+    def test_store(self):
+        G = Graph([[0, 1, 2], [[0, 1], [1, 2]]], FreeFunctor(2))
+        N = G.nerve()
+        cache.reset_stats()
+        try:
+            cache.budget(10 ** 9)
+            zt, mu = N.zeta(0), N.elimination(0)
+            faces = N.faces(0)
+            for name in ["zeta", "elimination", "faces"]:
+                self.assertTrue(cache.stats(name)["bytes"] > 0)
+            # evicting zeta drops the elimination built from it
+            cache.budget(cache.nbytes(faces))
+            self.assertTrue("zeta" not in N[0]._cache)
+            self.assertTrue("elimination" not in N[0]._cache)
+            self.assertTrue("faces" in N[0]._cache)
+            self.assertEqual(cache.stats("elimination")["evictions"], 1)
+        finally:
+            cache.budget(None)
@@ -2,6 +2,7 @@ import test
 import torch
 
 from topos import Complex, FreeFunctor
+from topos.core import Gram, sparse, face
 
 K = Complex.simplicial([[0, 1, 2, 3], [1, 2, 3, 4]])
 
@@ -28,6 +29,58 @@ class TestComplex (test.TestCase):
         expect = torch.zeros([2, 9])
         self.assertClose(expect, result)
 
+    def test_faces(self):
+        # hand-written face maps of an edge
+        E = Complex.simplicial([[0, 1]])
+        self.assertClose(E.face(0, 0).data.to_dense(), torch.tensor([[0., 1.]]))
+        self.assertClose(E.face(0, 1).data.to_dense(), torch.tensor([[1., 0.]]))
+        self.assertClose(E.diff(0).data.to_dense(), torch.tensor([[-1., 1.]]))
+        # per-face fmap construction
+        for KF in [K, Complex(K, FreeFunctor(2))]:
+            for d in range(3):
+                N, P = KF[d + 1].size, KF[d].size
+                tgt = KF[d + 1].keys
+                off = torch.stack([KF.begin[d + 1], KF.begin[d]]).long()
+                expect = torch.zeros([N, P])
+                for k in range(d + 2):
+                    ij = KF.fmap((tgt, face(k, tgt))).T - off
+                    Fk = sparse.matrix([N, P], ij).to_dense()
+                    self.assertClose(KF.face(d, k).data.to_dense(), Fk)
+                    expect += (-1.) ** k * Fk
+                self.assertClose(KF.diff(d).data.to_dense(), expect)
+
+    def test_laplacian(self):
+        # lazy Laplacian agrees with the sparse product
+        for d in range(4):
+            L = K.laplacian_lazy(d)
+            x = torch.randn([2, K[d].size])
+            self.assertClose(L.matvec(x), (L.data @ x.T).T)
+            self.assertClose(L.data.to_dense(), K.laplacian(d).data.to_dense())
+            cost = L.cost()
+            self.assertTrue(cost["product"] >= L.data._nnz())
+        # unfused factors
+        L1 = Gram([K.diff(1), K.codiff(1)], fused=False)
+        x = torch.randn([K[1].size])
+        self.assertClose(L1.matvec(x), K.laplacian_lazy(1).matvec(x))
+        # null Laplacian of a 0-dimensional complex
+        P = Complex.simplicial([[0], [1]])
+        L0 = P.laplacian_lazy(0)
+        self.assertClose(L0.matvec(torch.ones([2])), torch.zeros([2]))
+        self.assertEqual(L0.data._nnz(), 0)
+        # composition with linear operators
+        L, d0 = K.laplacian_lazy(1), K.diff(0)
+        LL = (L @ d0).data.to_dense()
+        self.assertClose(LL, L.data.to_dense() @ d0.data.to_dense())
+
+    def test_csr(self):
+        # CSR matvec agrees with COO matvec
+        d1 = K.diff(1)
+        x = torch.randn([9])
+        self.assertClose(d1.data @ x, d1.matvec(x))
+        # batched inputs
+        xs = torch.randn([3, 9])
+        self.assertClose((d1.data @ xs.T).T, d1.matvec(xs))
+
     def test_functor(self):
         """ 
         Test functor-valued differential 
@@ -0,0 +1,30 @@
+import test
+import torch
+
+from topos import Complex
+from topos.core import Eigen
+
+K = Complex.simplicial([[0, 1, 2, 3], [1, 2, 3, 4], [3, 4, 5, 6]])
+
+class TestEigen (test.TestCase):
+
+    def test_lobpcg(self):
+        L = K.laplacian_lazy(1)
+        w = torch.linalg.eigvalsh(L.data.to_dense())
+        # top and bottom eigenvalues from matvecs
+        vecs, vals = Eigen.lobpcg(L, 2, largest=True)
+        self.assertClose(vals, w[-2:].flip(0), tol=1e-3)
+        vecs, vals = Eigen.lobpcg(L, 2, largest=False)
+        self.assertClose(vals, w[:2], tol=1e-3)
+        # eigenvectors
+        self.assertClose(L.matvec(vecs), vals[:,None] * vecs, tol=1e-3)
+        # warm start
+        vecs2, vals2 = Eigen.lobpcg(L, 2, largest=False, X=vecs, maxiter=2)
+        self.assertClose(vals2, vals, tol=1e-3)
+
+    def test_elements(self):
+        A = torch.randn([40, 40])
+        A = A + A.T
+        w = torch.linalg.eigvalsh(A)
+        vecs, vals = Eigen.elements(A, 3)
+        self.assertClose(vals, w[w.abs().sort(descending=True).indices[:3]], tol=1e-3)
@@ -0,0 +1,34 @@
+import test
+import torch
+
+from topos.core import sparse, Shape, FFT
+
+class TestFFT(test.TestCase):
+
+    def test_sparse(self):
+        """ FFT agrees with sparse Fourier matrices """
+        F = FFT(Shape(4, 3))
+        x = torch.randn([2, 12])
+        result = F(x)
+        expect = sparse.matvec(F.to_sparse(), x)
+        self.assertClose(result, expect, 1e-5)
+        iF = F.inv()
+        result = iF(x)
+        expect = sparse.matvec(iF.to_sparse(), x)
+        self.assertClose(result, expect, 1e-5)
+
+    def test_inverse(self):
+        F = FFT([2, 3, 4])
+        x = torch.randn([24])
+        self.assertClose(F.inv() @ (F @ x), x.cfloat(), 1e-5)
+
+    def test_fields(self):
+        F = FFT([2, 3])
+        x = F.src(torch.randn([6]))
+        y = F(x)
+        self.assertTrue(y.domain is F.tgt.domain)
+        self.assertEqual(y.data.dtype, torch.cfloat)
+        self.assertClose(y.data, F.matvec(x.data), 1e-5)
+        ys = F(F.src.batched(3)(torch.randn([3, 6])))
+        self.assertEqual(list(ys.data.shape), [3, 6])
+        self.assertEqual(ys.data.dtype, torch.cfloat)
@@ -45,4 +45,24 @@ class TestFunctor(test.TestCase):
         idx = torch.arange(27)
         result = FG.fmap([5, 1])(idx)
         expect = (FG(1).index @ FG(5).res(1) @ FG(5).coords)(idx)
-        self.assertClose(expect.data, result.data)
\ No newline at end of file
+        self.assertClose(expect.data, result.data)
+
+    def test_batch_restrict(self):
+        """ Batched restriction graphs """
+        F = FreeFunctor(lambda i: int(2 + i))
+        a = torch.tensor([[0, 1, 2], [0, 1, 2], [1, 2, 3]])
+        b = torch.tensor([[1, 2], [0, 2], [1, 3]])
+        result = F.batch_restrict((a, b))
+        expect = torch.cat([F.fmap([ai, bi])(torch.arange(F(ai).size)).data
+                            for ai, bi in zip(a, b)])
+        self.assertClose(expect, result)
+
+    def test_batch_fmap(self):
+        """ Batched arrow map on raw arrow pairs """
+        F = FreeFunctor(lambda i: int(2 + i))
+        fs = [([0, 1, 2], [1, 2]), ([1, 3], [3]), ([0, 1, 2], [0]), 
+              ([2], [2]), ([1, 2, 3], [1, 3])]
+        result = F.batch_fmap(fs)
+        expect = torch.cat([F.fmap(f)(torch.arange(F(f[0]).size)).data
+                            for f in fs])
+        self.assertClose(expect, result)
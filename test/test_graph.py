@@ -23,6 +23,19 @@ class TestGraph (test.TestCase):
         A2[0, 1, 2] += 1
         self.assertClose(A2, G.adj[2].to_dense())
 
+    def test_adjacency(self):
+        # materialized
+        A1 = torch.tensor([[0, 1, 0],
+                           [1, 0, 1],
+                           [0, 1, 0]])
+        self.assertClose(A1, G.adjacency(1).to_dense())
+        self.assertEqual(G.adjacency(2)._nnz(), 6)
+        # queries
+        Q1 = torch.tensor([[1, 0], [2, 1], [0, 2], [1, 1]])
+        self.assertClose(G.adjacency(1, Q1), torch.tensor([1, 1, 0, 0]))
+        Q2 = torch.tensor([[2, 0, 1], [0, 0, 1]])
+        self.assertClose(G.adjacency(2, Q2), torch.tensor([1, 0]))
+
     def test_index(self):
         # Query 0
         Q0 = torch.arange(4).view([4, 1])
@@ -52,6 +65,10 @@ class TestGraph (test.TestCase):
         self.assertEqual(Q0, [0, 1, 2, 3, 4, 5])
         self.assertEqual(Q1, [[3, 0], [3, 1], [4, 1], [4, 2],
                               [5, 0], [5, 1], [5, 2], [5, 3], [5, 4]])
+        # forgotten indices
+        J = Q.forgotten.tolist()
+        self.assertEqual(J, [[2, 0], [1, 0], [2, 0], [1, 0],
+                             [2, 3], [1, 3], [1, 2], [3, 0], [1, 0]])
 
 
 GF = Graph(G, FreeFunctor(3))
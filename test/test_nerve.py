@@ -1,7 +1,8 @@
 import test
 import torch
 
-from topos.base import Graph, Nerve, FreeFunctor
+from topos.base import Graph, Complex, Nerve, FreeFunctor
+from topos.core import SubsetTransform
 
 G = Graph([[0],
            [[0, 1],[0, 2], [0, 3]],
@@ -84,4 +85,37 @@ class TestNerveFunctor(test.TestCase):
         mu1, zt1 = N.mu(1), N.zeta(1)
         result = (mu1 @ zt1).data.to_dense()
         expect = torch.eye(N[1].size)
-        self.assertClose(expect, result)
\ No newline at end of file
+        self.assertClose(expect, result)
+
+    def test_mobius(self):
+        """ Matrix-free Möbius inversion """
+        GF = Graph(G, FreeFunctor(3))
+        NF = GF.nerve()
+        for d in range(2):
+            zt, mu, mobius = NF.zeta(d), NF.mu(d), NF.mobius(d)
+            y = torch.randn([4, NF[d].size])
+            x = mobius.matvec(y)
+            self.assertClose(zt.matvec(x), y)
+            self.assertClose(mu.matvec(y), x)
+            # transpose
+            self.assertClose(mobius.t().matvec(y), mu.t().matvec(y))
+
+    def test_subsets(self):
+        """ Fast subset transforms on downward closed nerves """
+        self.assertTrue(N.subsets() is None)
+        K = Complex.simplicial([list(range(8)), list(range(1, 9))])
+        NK = Nerve.classify(K)
+        tables = NK.subsets()
+        self.assertEqual([list(T.shape) for m, T in tables], [[2, 256]])
+        zt, mobius = NK.zeta_fast(0), NK.mobius(0)
+        self.assertTrue(isinstance(zt, SubsetTransform))
+        x = torch.randn([3, NK[0].size])
+        self.assertClose(zt.matvec(x), NK.zeta(0).matvec(x))
+        self.assertClose(mobius.matvec(zt.matvec(x)), x)
+        # sparse operators through ordered elimination
+        mu = NK.mu(0)
+        self.assertClose(mu.matvec(x), mobius.matvec(x), tol=1e-4)
+        self.assertClose(mobius.t().matvec(x), mu.t().matvec(x), tol=1e-4)
+        self.assertClose(mobius.data.to_dense(), mu.data.to_dense())
+        expect = mu.t().matvec(torch.ones([NK[0].size]))
+        self.assertClose(NK.bethe(0).data, expect)
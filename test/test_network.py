@@ -0,0 +1,77 @@
+import test
+import torch
+
+from topos.bp import IsingNetwork, BetheDiffusion, GBPDiffusion
+
+N = IsingNetwork.lattice(2, 3)
+
+class TestNetwork (test.TestCase):
+
+    def test_freeDiff(self):
+        for beta in [1., 3.]:
+            D  = N.freeDiff(beta)
+            Ds = N.freeDiff(beta, fused=False)
+            H = N.randn(0)
+            self.assertClose(D(H).data, Ds(H).data, tol=1e-4)
+            # batched energies
+            hs = torch.randn([4, N[0].size])
+            Hs, H1 = N.field(hs, 0), N.field(hs[1], 0)
+            self.assertClose(D(Hs).data[1], Ds(H1).data, tol=1e-4)
+
+    def test_compiled(self):
+        H = N.randn(0)
+        for Diff in [BetheDiffusion, GBPDiffusion]:
+            X = Diff(N, 1.)
+            expect = X.euler(0.1, 3)(H).data
+            result = X.compiled(0.1, 3, backend=None)(H.data)
+            self.assertClose(expect, result, tol=1e-4)
+
+    def test_converge(self):
+        H = N.randn(0)
+        X = GBPDiffusion(N, 1.)
+        # fixed step
+        x, info = X.converge(0.5, tol=1e-4, maxiter=500)(H)
+        self.assertTrue(info["converged"])
+        self.assertTrue(info["residual"] <= 1e-4)
+        self.assertClose(X(x).data, N.zeros(0).data, tol=1e-3)
+        # adaptive step by step doubling
+        x, info = X.converge(2., tol=1e-4, maxiter=500, adaptive=True)(H)
+        self.assertTrue(info["converged"])
+        self.assertTrue(info["dt"] <= 2.)
+        self.assertTrue(info["dt_next"] == min(2., 1.5 * info["dt"]))
+
+    def test_batched(self):
+        hs = torch.randn([3, N[0].size])
+        Hs, H1 = N.field(hs, 0), N.field(hs[1], 0)
+        F = N.freeEnergy(2.)
+        self.assertClose(F(Hs).data[1], F(H1).data)
+        for Diff in [BetheDiffusion, GBPDiffusion]:
+            X = Diff(N, 1.)
+            expect = X.euler(0.1, 3)(H1).data
+            self.assertClose(X.euler(0.1, 3)(Hs).data[1], expect, tol=1e-4)
+            result = X.compiled(0.1, 3, backend=None)(hs)
+            self.assertClose(result[1], expect, tol=1e-4)
+
+    def test_prioritized(self):
+        H = N.randn(0)
+        X = GBPDiffusion(N, 1.)
+        h, info = X.prioritized(0.5, k=4)(H.data, tol=1e-4, maxiter=5000)
+        self.assertTrue(info["converged"])
+        self.assertClose(X.kernel(h), torch.zeros([N[0].size]), tol=1e-3)
+
+    def test_converge_writers(self):
+        H = N.randn(0)
+        for adaptive in [False, True]:
+            X = GBPDiffusion(N, 1.)
+            calls = []
+            X.writer(lambda x, n: calls.append(n))
+            x, info = X.converge(0.5, tol=1e-3, maxiter=50, adaptive=adaptive)(H)
+            self.assertEqual(calls, list(range(info["iterations"])))
+
+    def test_write(self):
+        H = N.randn(0)
+        X = GBPDiffusion(N, 1.)
+        with X.write({"energy": N.freeBethe()}, every=3, size=2) as out:
+            X.euler(0.1, 10)(H)
+        self.assertEqual(len(out["energy"]), 2)
+        self.assertClose(out["energy"].iterations(), torch.tensor([6, 9]))
@@ -0,0 +1,37 @@
+import test
+import torch
+
+from topos.core import segment
+
+begin = torch.tensor([0, 2, 5, 5])
+end   = torch.tensor([2, 5, 5, 9])
+idx   = segment.fibers(begin, end)
+
+class TestSegment(test.TestCase):
+
+    def test_fibers(self):
+        expect = torch.tensor([0, 0, 1, 1, 1, 3, 3, 3, 3])
+        self.assertClose(expect, idx)
+
+    def test_sum(self):
+        x = torch.arange(9.)
+        result = segment.sum(x, idx, 4)
+        expect = torch.tensor([1., 9., 0., 26.])
+        self.assertClose(expect, result)
+
+    def test_max(self):
+        x = torch.randn([3, 9])
+        result = segment.max(x, idx, 4)
+        self.assertClose(result[:,0], x[:,:2].max(-1).values)
+        self.assertTrue((result[:,2] == float('-inf')).prod())
+
+    def test_logsumexp(self):
+        # batched and large inputs
+        x = 100 * torch.randn([3, 9])
+        result = segment.logsumexp(x, idx, 4)
+        expect = torch.stack([x[:,b:e].logsumexp(-1) 
+                              for b, e in zip(begin, end)], -1)
+        self.assertClose(result[:,[0, 1, 3]], expect[:,[0, 1, 3]], 1e-3)
+        # softmax
+        p = segment.softmax(x, idx, 4)
+        self.assertClose(segment.sum(p, idx, 4)[:,[0, 1, 3]], torch.ones([3, 3]))
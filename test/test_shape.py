@@ -0,0 +1,34 @@
+import test
+import torch
+
+from topos.core import Shape
+
+S = Shape(2, 3, 4)
+
+class TestShape(test.TestCase):
+
+    def test_interned(self):
+        self.assertTrue(Shape(2, 3, 4) is S)
+        self.assertEqual(S.mod.tolist(), [12, 4, 1])
+
+    def test_coords(self):
+        i = torch.arange(S.size)
+        x = S.coords(i)
+        self.assertEqual(list(x.shape), [24, 3])
+        self.assertEqual(x[17].tolist(), [1, 1, 1])
+        self.assertClose(S.index(x), i)
+
+    def test_res(self):
+        i = torch.arange(S.size)
+        x = S.coords(i)
+        self.assertClose(S.res(2, 0)(i), 2 * x[:,2] + x[:,0])
+        # batched dimensions
+        ds = torch.tensor([[2, 0], [1, 2]]).repeat(12, 1)
+        result = S.res(ds)(i)
+        expect = torch.where(i % 2 == 0, 2 * x[:,2] + x[:,0], 4 * x[:,1] + x[:,2])
+        self.assertClose(result, expect)
+
+    def test_embed(self):
+        self.assertEqual(S.embed(0, 2)(torch.tensor([1, 3])), 15)
+        xs = torch.tensor([[1, 3], [0, 2]])
+        self.assertClose(S.embed(0, 2)(xs), torch.tensor([15, 2]))
@@ -2,6 +2,7 @@ from test import TestCase
 
 import torch
 from topos.base import Sheaf
+from topos.core import sparse
 
 F = Sheaf.sparse([4, 4], [[0, 1], [1, 2], [2, 3], [0, 2]])
 
@@ -16,6 +17,13 @@ class TestSheafSparse(TestCase):
         expect = torch.tensor([0, 1, 2, 3])
         self.assertClose(expect, result)
 
+    def test_keyindex(self):
+        keys = torch.tensor([[0, 2], [2, 3], [3, 0]], dtype=torch.long)
+        idx, mask = F.keyindex.find(keys)
+        self.assertClose(idx, torch.tensor([1, 3, 0]))
+        self.assertTrue((mask == torch.tensor([1, 1, 0])).prod())
+        self.assertClose(sparse.select(F.keyindex, keys), idx)
+
     def test_slice(self):
         begin, end, fiber = F.slice([0, 1])
         result = begin, end, fiber.size
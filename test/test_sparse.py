@@ -0,0 +1,28 @@
+import test
+import torch
+
+from topos.core import sparse, Shape
+
+class TestSparse(test.TestCase):
+
+    def test_matmul_complex(self):
+        S = Shape(4, 3)
+        F  = sparse.matrix([12, 12], *sparse.Fourier(S), t=False)
+        iF = sparse.matrix([12, 12], *sparse.iFourier(S), t=False)
+        # iF @ F = Id
+        result = sparse.matmul(iF, F)
+        self.assertTrue(result.is_coalesced())
+        self.assertClose(result.to_dense(), torch.eye(12).cfloat(), 1e-5)
+        # mixed real / complex operands
+        x = torch.randn([12, 2])
+        result = sparse.matmul(iF, sparse.matmul(F, x))
+        self.assertClose(result, x.cfloat(), 1e-5)
+
+    def test_index_select(self):
+        ijk = torch.randint(5, [3, 40])
+        A = sparse.tensor([5, 5, 5], ijk, torch.randn([40]), t=False)
+        idx = torch.tensor([4, 0, 0, 2])
+        for dim in range(3):
+            result = sparse.index_select(A, idx, dim).to_dense()
+            expect = A.to_dense().index_select(dim, idx)
+            self.assertClose(result, expect)
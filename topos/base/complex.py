@@ -1,4 +1,4 @@
-from topos.core import sparse, face, simplices, Linear, linear_cache
+from topos.core import sparse, face, simplices, Linear, linear_cache, store, Gram
 from topos.io   import readTensor
 from .graph     import Graph
 
@@ -25,14 +25,10 @@ class Complex (Graph):
     @linear_cache("d")
     def diff(self, d):
         """ Differential d: K[d] -> K[d + 1]. """
-        src, tgt = self[d].keys, self[d + 1].keys
-        N, P   = self[d+1].size, self[d].size
-        N0, P0 = self.begin[d+1], self.begin[d]
-        out = sparse.matrix([N, P], [])
-        off = torch.stack([N0, P0]).long()
-        for k in range(d + 2):
-            Fk = self.fmap((tgt, face(k, tgt))).T - off 
-            out += (-1.) ** k * sparse.matrix([N, P], Fk)
+        N, P = self[d+1].size, self[d].size
+        F, k = self.faces(d)
+        sign = 1. - 2. * (k % 2)
+        out  = sparse.matrix([N, P], F, sign, t=False).coalesce()
         return Linear(self[d], self[d + 1])(out, degree=1, name="d")
     
     @linear_cache("d*")
@@ -50,15 +46,49 @@ class Complex (Graph):
         return (self.diff(d-1) @ self.codiff(d) 
                 + self.codiff(d+1) @ self.diff(d))
 
+    @linear_cache("L_lazy")    
+    def laplacian_lazy(self, d):
+        """ 
+        Lazy Hodge Laplacian L : K[d] -> K[d].
+
+        Returns an operator applying `d* @ d + d @ d*` factor by factor 
+        (see `Gram`), equal to `laplacian(d)` without forming the product. 
+        The sparse product is only built by `L.to_sparse()`.
+        """
+        As = ([self.diff(d)] if d < self.dim else []) \
+           + ([self.codiff(d)] if d > 0 else [])
+        return Gram(As, "L", domain=self[d])
+
     def face(self, d, k):
         """ Face map forgetting index k : K[d] -> K[d + 1]. """
-        src, tgt = self[d].keys, self[d + 1].keys
-        N, P   = self[d+1].size, self[d].size
-        N0, P0 = self.begin[d+1], self.begin[d]
-        off = torch.stack([N0, P0]).long()
-        ij = self.fmap((tgt, face(k, tgt))).T - off
-        Fk = sparse.matrix([N, P], ij)
+        N, P = self[d+1].size, self[d].size
+        F, ks = self.faces(d)
+        Fk = sparse.matrix([N, P], F[:, ks == k], t=False)
         return Linear(self[d], self[d + 1])(Fk, degree=1, name=f"face{k}")
+
+    def faces(self, d):
+        """
+        Graphs of all face maps K[d] -> K[d + 1], computed in one call.
+
+        Returns the concatenated graph `F` of shape [2, E], with indices
+        relative to K[d + 1] and K[d], along with the index `k` of the 
+        face map of each edge, of shape [E]. 
+        """
+        cache = self[d]._cache
+        if "faces" in cache:
+            return cache["faces"]
+        tgt = self[d + 1].keys
+        n   = d + 2
+        fs  = torch.stack([face(k, tgt) for k in range(n)]).reshape([-1, d + 1])
+        off = torch.stack([self.begin[d+1], self.begin[d]]).long()
+        F   = (self.fmap((tgt.repeat(n, 1), fs)).T - off).T.long()
+        #--- face index of each edge
+        cells = self[d].index(fs).view([n, -1]).T
+        ci = self[d+1].segments()[F[0]]
+        cj = self[d].segments()[F[1]]
+        k  = (cells[ci] == cj[:,None]).long().argmax(1)
+        store(cache, "faces", (F, k))
+        return F, k
     
     @classmethod
     def simplicial(cls, faces):
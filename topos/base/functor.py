@@ -1,14 +1,23 @@
 import fp
 import topos.io as io
 
+from topos.core       import sparse
+from topos.core.shape import ravel, unravel
+
 import torch
 
 class Functor:
 
-    def __init__(self, f0, f1):
-        """ Create functor from object and arrow maps. """
+    def __init__(self, f0, f1, batch=None):
+        """ 
+        Create functor from object and arrow maps. 
+
+        The optional `batch` argument is a vectorized arrow map,
+        see `Functor.batch_fmap`.
+        """
         self.obj_map = f0
         self.hom_map = f1
+        self.batch_map = batch
         try:
             if f0.__doc__: self.__call__.__func__.__doc__ = f0.__doc__
             if f1.__doc__:self.fmap.__func__.__doc__ = f1.__doc__ 
@@ -23,6 +32,17 @@ class Functor:
         """ Arrow map. """
         return self.hom_map(f)
 
+    def batch_fmap(self, fs):
+        """ 
+        Concatenated graphs of the arrow map over a batch of arrows.
+
+        Uses the vectorized arrow map if the functor was created 
+        with one, and otherwise loops over arrows. 
+        """
+        if self.batch_map is not None:
+            return self.batch_map(fs)
+        return fmap_loop(self, fs)
+
     def __matmul__(self, other):
         """ Functor composition. """
         f0 = lambda i:self(other(i))
@@ -30,6 +50,20 @@ class Functor:
         return Functor(f0, f1)
 
 
+def fmap_loop(functor, fs):
+    """ 
+    Concatenate the graphs `functor.fmap(f)` over arrows f, one at a time.
+    """
+    graphs = []
+    for f in fs:
+        Tf = functor.fmap(f)
+        src = functor(f[0])
+        N = src.size if 'size' in dir(src) else fp.Torus(src).size
+        graphs.append(Tf(torch.arange(N)).data)
+    return (torch.cat(graphs) if len(graphs) 
+                              else torch.zeros([0], dtype=torch.long))
+
+
 class ConstantFunctor(Functor):
     """
     Constant Functor i.e. with one target object and identities. 
@@ -75,12 +109,16 @@ class FreeFunctor(Functor):
             self.atomic = F
         assert(callable(F))
 
-        # object map
+        # object map, shared between regions of equal shapes
+        tori = {}
         def obj(a):
             """ 
             Cartesian product of objects over a = [i0, ..., ik].
             """
-            return fp.Torus([F(i) for i in a])
+            ns = tuple(int(F(i)) for i in a)
+            if ns not in tori:
+                tori[ns] = fp.Torus(list(ns))
+            return tori[ns]
 
         # arrow map
         def fmap(f):
@@ -92,4 +130,70 @@ class FreeFunctor(Functor):
             js = torch.bucketize(b, a)
             return tgt.index @ src.res(*js) @ src.coords 
 
-        super().__init__(obj, fmap)
\ No newline at end of file
+        super().__init__(obj, fmap, self.batch_pairs)
+
+    def shapes(self, a):
+        """ 
+        Atomic shapes of a (batched) integer tensor of vertices.
+        """
+        a = io.readTensor(a, dtype=torch.long)
+        if isinstance(self.atomic, int):
+            return torch.full_like(a, self.atomic)
+        vtx, inv = torch.unique(a, return_inverse=True)
+        ns = torch.tensor([int(self.atomic(int(i))) for i in vtx], dtype=torch.long)
+        return ns[inv]
+
+    def batch_pairs(self, fs):
+        """
+        Concatenated restriction graphs over a batch of arrows `(a, b)`.
+
+        Arrows are grouped by the lengths of their source and target,
+        and each group is lifted by a single call to `batch_restrict`.
+        Graphs are concatenated in the order of arrows.
+        """
+        fs = [(io.readTensor(f[0], dtype=torch.long), 
+               io.readTensor(f[1], dtype=torch.long)) for f in fs]
+        if not len(fs):
+            return torch.zeros([0], dtype=torch.long)
+        #--- graph offsets of each arrow
+        ns  = torch.stack([self.shapes(a).prod() for a, b in fs])
+        end = ns.cumsum(0)
+        begin = end - ns
+        #--- lift arrows by signature
+        sig = torch.tensor([[a.numel(), b.numel()] for a, b in fs])
+        out = torch.zeros([int(end[-1])], dtype=torch.long)
+        for p, q in torch.unique(sig, dim=0).tolist():
+            ids = ((sig[:,0] == p) & (sig[:,1] == q)).nonzero().flatten()
+            a = torch.stack([fs[n][0].reshape([p]) for n in ids.tolist()])
+            b = torch.stack([fs[n][1].reshape([q]) for n in ids.tolist()])
+            _, pos = sparse.ranges(begin[ids], end[ids])
+            out[pos] = self.batch_restrict((a, b))
+        return out
+
+    def batch_restrict(self, f):
+        """
+        Concatenated restriction graphs of a batch of inclusions.
+
+        Given `f = (a, b)` with tensors `a` and `b` of shapes [A, k] 
+        and [A, r] representing A inclusions `b[n] <= a[n]` with sorted 
+        vertices, returns the tensor obtained by concatenating 
+        
+            F.fmap((a[n], b[n]))(torch.arange(F(a[n]).size))
+
+        for 0 <= n < A, computed in one vectorized pass.
+        """
+        a = io.readTensor(f[0], dtype=torch.long)
+        b = io.readTensor(f[1], dtype=torch.long)
+        if a.dim() == 1:
+            a, b = a.unsqueeze(0), b.unsqueeze(0)
+        #--- shapes of F(a) and positions of b in a
+        ns_a = self.shapes(a)
+        js   = torch.searchsorted(a.contiguous(), b.contiguous())
+        ns_b = ns_a.gather(-1, js)
+        #--- source indices, labeled by arrow
+        N_a  = ns_a.prod(-1)
+        n, x = sparse.ranges(torch.zeros_like(N_a), N_a)
+        #--- restrict coordinates
+        xa = unravel(x, ns_a[n])
+        xb = xa.gather(-1, js[n])
+        return ravel(xb, ns_b[n])
@@ -4,8 +4,9 @@ from topos.core import sparse, Shape, simplices
 import topos.io as io
 import topos.base.nerve 
 import torch
+import itertools
 
-from .functor import Functor
+from .functor import Functor, FreeFunctor
 from .multigraph import MultiGraph
 
 
@@ -34,16 +35,51 @@ class Graph (MultiGraph):
                       [[0, 1], [1, 2]])
         """
         super().__init__(grades, functor, sort, name)     
+        self._canonical = {}
 
-    def adjacency(self, k):
-        """ Symmetric adjacency tensor in degree k. """
-        #--- symmetrize adjacency
-        shape = self.adj[k].size()
-        Ak = sparse.tensor(shape, [])
-        Sk = SymGroup(k + 1)
-        for sigma in Sk:
-            Ak += sparse.tensor(shape, self[k].index_select(1, sigma))
-        return Ak
+    def adjacency(self, k, js=None):
+        """ 
+        Symmetric adjacency tensor in degree k. 
+
+        The symmetric adjacency counts hyperedges of G[k] 
+        equal to [j0, ..., jk] up to permutation:
+
+            A[j] = sum [G.adj[k][j o s] for s in Sym(k + 1)]
+
+        Given query tuples `js` of shape [N, k + 1], returns A[js] 
+        by sorting tuples into canonical order and looking them up 
+        in `G.canonical(k)`, without materializing A. 
+
+        Otherwise A is returned as a sparse tensor, built in one pass. 
+        """
+        keys = self[k].keys[:,:k+1]
+        shape = [self.Nvtx] * (k + 1)
+        #--- materialize symmetric tensor
+        if js is None:
+            perms = list(itertools.permutations(range(k + 1)))
+            perms = torch.tensor(perms, dtype=torch.long)
+            ij = keys[:,perms].reshape([-1, k + 1])
+            return sparse.tensor(shape, ij, dtype=torch.long).coalesce()
+        #--- canonical lookup
+        js = io.readTensor(js, dtype=torch.long)
+        q  = js.sort(-1).values
+        nq = self.canonical(k).select(q)
+        # number of permutations fixing each tuple
+        eq = (q[..., :, None] == q[..., None, :]).tril().sum(-1).prod(-1)
+        return nq * eq
+
+    def canonical(self, k):
+        """ 
+        Key index of hyperedges of G[k] sorted into canonical order.
+
+        Values count the hyperedges of G[k] having the same vertices.
+        """
+        if k not in self._canonical:
+            q = self[k].keys[:,:k+1].sort(-1).values
+            shape = [self.Nvtx] * (k + 1)
+            A = sparse.tensor(shape, q, dtype=torch.long)
+            self._canonical[k] = sparse.KeyIndex(A)
+        return self._canonical[k]
 
     def fmap (self, f):
         """
@@ -78,12 +114,16 @@ class Graph (MultiGraph):
         Quiver of strict 1-chains a > b for inclusion.
 
         The restriction maps G.obj(a) -> G.obj(b) are encoded 
-        as edge labels i.e. edges q of Q[1] are of the form: 
+        by edge labels, stored in the `Q.forgotten` tensor whose 
+        rows are aligned with the edges q = [a, b] of Q[1]: 
 
-            q = [a, b, 1 + j0, ..., 1 + jk, 0, ..., 0] 
+            Q.forgotten[q] = [1 + j0, ..., 1 + jk, 0, ..., 0] 
 
         where j0, ..., jk are the position (< a.dim) of 
         forgotten indices in the restriction a -> b.
+
+        All (a, b) pairs and their labels are concatenated 
+        before being sorted and deduplicated once.
         """
         # Cache quiver
         if not isinstance(self._quiver, type(None)):
@@ -98,39 +138,84 @@ class Graph (MultiGraph):
             lift = Functor(lambda a: a[0] if a.dim() else a,
                            lambda f: f)
             F = self.functor @ T.Coords @ lift
-            return Quiver(Q, F)
+            if isinstance(self.functor, FreeFunctor):
+                F.batch_map = lambda fs: T.restrictions(self.functor, fs)
+            self._quiver = Quiver(Q, F)
+            self._quiver.forgotten = Q.forgotten
+            return self._quiver
 
         # Base quiver i.e. scalar valued
-        Ntot = self.Ntot
-        Q1  = sparse.matrix([Ntot, Ntot], [])
-        fibers = []
-        maps = []
+        Ntot, width = self.Ntot, self.dim
+        src, tgt, lbl = [], [], []
 
         for d, Gd in enumerate(self.fibers):
-            # Source d-cells
+            # Source d-cells, sorted as in G[d]
             Ad = Gd.keys
             nd = Ad.shape[0]
-            idx_src = sparse.select(self.idx[d], Ad) + self.begin[d]
+            idx_src = torch.arange(nd) + self.begin[d]
             # subfaces and forgotten indices
-            faces = simplices(Ad)
+            faces, forgotten = simplices(Ad, indices=True)
             # Target k-cells
             for k, Bk in enumerate(faces[:-1]):
                 # Bk is of shape (nd, nk, k+1):
                 nk = Bk.shape[1]
                 Bk = Bk.reshape([-1, k+1])
                 # Index map
-                mask = sparse.index_mask(self[k].adj, Bk)
-                src  = idx_src.repeat_interleave(nk)
-                tgt  = sparse.select(self[k].idx, Bk) + self.begin[k]
-                AB   = torch.stack([src[mask], tgt[mask]])
+                idx_tgt, mask = self[k].keyindex.find(Bk)
+                src += [idx_src.repeat_interleave(nk)[mask]]
+                tgt += [(idx_tgt + self.begin[k])[mask]]
                 # Label edges by forgotten indices
-                Q1 += sparse.matrix([Ntot, Ntot], AB.T)
-
-        edges = Q1.coalesce().indices().T
-        Q = Quiver([torch.arange(Ntot), edges])
+                Jk = torch.zeros([nk, width], dtype=torch.long)
+                Jk[:, :d-k] = 1 + torch.tensor(forgotten[k], dtype=torch.long)
+                lbl += [Jk.repeat(nd, 1)[mask]]
+
+        # Sort and deduplicate (a, b) pairs once
+        if len(src):
+            src, tgt, lbl = torch.cat(src), torch.cat(tgt), torch.cat(lbl)
+        else:
+            src = tgt = torch.zeros([0], dtype=torch.long)
+            lbl = torch.zeros([0, width], dtype=torch.long)
+        key, order = (Ntot * src + tgt).sort(stable=True)
+        first = torch.ones_like(key, dtype=torch.bool)
+        first[1:] = key[1:] != key[:-1]
+        keep  = order[first]
+        edges = torch.stack([src[keep], tgt[keep]], 1)
+
+        Q = Quiver([torch.arange(Ntot), edges], sort=False)
+        Q.forgotten = lbl[keep]
         self._quiver = Q   
         return self._quiver
 
+    def restrictions(self, functor, arrows):
+        """
+        Concatenated restriction graphs of a free functor over arrows.
+
+        Arrows `[a, b, ...]` between cells of the graph are grouped by 
+        the degrees of their source and target, and each group is lifted 
+        by a single call to `functor.batch_restrict`. Graphs are concatenated 
+        in the order of arrows. 
+        """
+        arrows = io.readTensor(arrows, dtype=torch.long)
+        i, j = arrows[:,0], arrows[:,1]
+        #--- degrees of source and target cells
+        off = self.sizes.cumsum(0)
+        di  = torch.bucketize(i, off, right=True)
+        dj  = torch.bucketize(j, off, right=True)
+        #--- graph offsets of each arrow
+        ns  = torch.cat([functor.shapes(Gd.keys[:,:d+1]).prod(-1)
+                         for d, Gd in enumerate(self.fibers)])
+        end = ns[i].cumsum(0)
+        begin = end - ns[i]
+        #--- lift arrows by signature
+        out = torch.zeros([int(end[-1]) if len(end) else 0], dtype=torch.long)
+        for p, q in torch.unique(torch.stack([di, dj], 1), dim=0).tolist():
+            ids = ((di == p) & (dj == q)).nonzero().flatten()
+            a = self[p].keys[i[ids] - self.begin[p], :p+1]
+            b = self[q].keys[j[ids] - self.begin[q], :q+1]
+            _, pos = sparse.ranges(begin[ids], end[ids])
+            out[pos] = functor.batch_restrict((a, b))
+        return out
+
     def __repr__(self):
         return f"{self.__name__}"
 
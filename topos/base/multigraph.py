@@ -104,8 +104,7 @@ class MultiGraph (Sheaf):
         n = 0
         while js.shape[-1] != (n + 1) + self.nlabels[n]:
             n += 1
-        offset = self.sizes[n]
-        idx = sparse.select(self.idx[n], js)
+        idx, mask = self[n].keyindex.find(js)
         #--- Graded fiber offset
         offsets = self.sizes.cumsum(0).roll(1)
         offset  = offsets[n] if n > 0 else 0
@@ -113,7 +112,6 @@ class MultiGraph (Sheaf):
         if output == None:
             return idx + offset
         #--- Keep mask
-        mask = sparse.index_mask(self.adj[n], js)
         return idx + offset, mask
 
     def index_fmap(self, f):
@@ -1,4 +1,5 @@
-from topos.core import sparse, Shape, Linear, linear_cache
+from topos.core import sparse, Shape, Linear, linear_cache, store, once
+from topos.core import TriangularInverse, SubsetTransform
 import topos.io as io
 
 from .functor   import Functor
@@ -42,17 +43,124 @@ class Nerve (Complex):
     
     @linear_cache("mu", "\u03bc")
     def mu(self, d=0):
-        n = self.dim + 1
-        zt = self.zeta(d)
-        Id = self.eye(d)
-        dz1 = self.zeta(d) - Id
-        dzi = dz1 + (Id - Id)
-        mobius = Id
-        mobius.__name__ = '\u03bc'
-        for i in range(1, n):
-            mobius = mobius + (-1)**i * dzi
-            dzi = dzi @ dz1
-        return mobius
+        """
+        Degree-d Möbius transform, inverse of zeta.
+
+        As zeta is unitriangular with respect to inclusion, 
+        mu is computed by ordered elimination (see `Nerve.elimination`),
+        whichever operator `Nerve.mobius` applies.
+        """
+        mobius = self.elimination(d).to_sparse()
+        return Linear(self[d], self[d])(mobius, 0, "\u03bc")
+
+    def elimination(self, d=0):
+        """
+        Degree-d Möbius transform as a `TriangularInverse` of zeta.
+        """
+        cache = self[d]._cache
+        if "elimination" not in cache:
+            zt = self.zeta(d)
+            store(cache, "elimination", 
+                  TriangularInverse(zt.data, self[d], "\u03bc"),
+                  after=[(cache, "zeta")])
+        return cache["elimination"]
+
+    def mobius(self, d=0):
+        """
+        Matrix-free degree-d Möbius transform.
+
+        Applies mu by solving `zeta x = y` level by level, 
+        without forming the matrix of mu (see `TriangularInverse`).
+        In degree 0, fast subset transforms are used instead when
+        the nerve is downward closed (see `Nerve.zeta_fast`).
+        """
+        tables = self._fast_subsets(d)
+        if tables is None:
+            return self.elimination(d)
+        cache = self[d]._cache
+        if "mobius" not in cache:
+            mu = lambda: self.mu(0)
+            store(cache, "mobius", 
+                  SubsetTransform(tables, self[0].size, True,
+                                  self[0], "\u03bc", mu))
+        return cache["mobius"]
+
+    def zeta_fast(self, d=0):
+        """
+        Apply-only degree-d zeta transform.
+
+        Fast subset transforms are used in degree 0 when the nerve 
+        is downward closed (see `Nerve.subsets`) and they cost fewer 
+        operations than the sparse matrix. Otherwise, the cached sparse 
+        operator `Nerve.zeta(d)` is returned. 
+        """
+        tables = self._fast_subsets(d)
+        if tables is None:
+            return self.zeta(d)
+        cache = self[0]._cache
+        if "zeta_fast" not in cache:
+            zt = lambda: self.zeta(0)
+            store(cache, "zeta_fast", 
+                  SubsetTransform(tables, self[0].size, False,
+                                  self[0], "\u03b6", zt))
+        return cache["zeta_fast"]
+
+    def _fast_subsets(self, d):
+        """ Subset tables, if subset transforms are cheaper in degree d. """
+        tables = self.subsets() if d == 0 else None
+        if tables is None:
+            return None
+        # butterfly steps cost about twice as much as sparse nonzeros
+        cost = sum(m * T.numel() for m, T in tables)
+        nnz  = self[0].size + self.grades[1].shape[0]
+        return tables if 2 * cost <= nnz else None
+
+    @once
+    def subsets(self):
+        """
+        Subset tables of maximal regions, if the nerve is downward closed.
+
+        The nerve of a hypergraph K is downward closed when K contains 
+        all nonempty subsets of its regions, e.g. for simplicial complexes.
+        For each cardinal m of maximal regions, returns the pair (m, T) 
+        where T of shape [R, 2^m] indexes subsets of the R maximal regions
+        by bitmask (see `SubsetTransform`). Returns None otherwise. 
+
+        N.B. Subset tables are only computed for trivial (scalar valued)
+        nerves: this always returns None for functor valued networks, 
+        so that belief propagation never takes the fast subset path.
+        """
+        if not self.trivial or '_classified' not in dir(self):
+            return None
+        K, Q = self._classified, self._quiver
+        if any(K.nlabels) or 'forgotten' not in dir(Q):
+            return None
+        #--- cardinal of regions
+        ns   = torch.tensor([Kd.keys.shape[0] for Kd in K.fibers])
+        card = 1 + torch.arange(len(ns)).repeat_interleave(ns)
+        a, b = Q.grades[1][:,0], Q.grades[1][:,1]
+        #--- all proper nonempty subsets are regions
+        below = torch.bincount(a, minlength=card.shape[0])
+        if not torch.equal(below, 2 ** card - 2):
+            return None
+        #--- bitmask of b in a, from forgotten positions
+        f = Q.forgotten
+        drop = torch.where(f > 0, 2 ** (f - 1).clamp(min=0), 0).sum(-1)
+        mask = 2 ** card[a] - 1 - drop
+        #--- tables of maximal regions
+        maximal = torch.ones_like(card, dtype=torch.bool)
+        maximal[b] = False
+        tables = []
+        for m in card[maximal].unique().tolist():
+            M   = (maximal & (card == m)).nonzero().flatten()
+            row = torch.full_like(card, -1)
+            row[M] = torch.arange(M.shape[0])
+            T = torch.full([M.shape[0], 2 ** m], -1, dtype=torch.long)
+            T[:, -1] = M
+            e = row[a] >= 0
+            T[row[a[e]], mask[e]] = b[e]
+            tables.append((m, T))
+        return tables
 
     @linear_cache("zeta", "\u03b6")
     def zeta (self, d=0):
@@ -149,7 +257,7 @@ class Nerve (Complex):
         for d, ztd in enumerate(zt):
             lin = Linear(self[d], self[d])(ztd, degree=0, name="\u03b6")
             out += [lin]
-            self[d]._cache["zeta"] = lin
+            store(self[d]._cache, "zeta", lin)
         return out
 
     def fmap(self, f):
@@ -222,15 +330,20 @@ class Nerve (Complex):
         N1   = N1.coalesce()
         # nerve Nd, d <= 1
         N = [N0, N1]
-        arr = [N1[i].coalesce().indices() for i in range(Ntot)]
+        src, tgt = N1.indices()
         deg = 2
         if d == 1: return N
         # nerve Nd, d > 1
         while deg != d:
-            ijk = [torch.cat([ij, k]) for ij in N[-1].indices().T \
-                                for k in arr[ij[-1]].T]
-            if not len(ijk): break
-            Nd = sparse.matrix([Ntot] * (deg + 1), torch.stack(ijk))
+            # extend chains by the arrows leaving their last object
+            chains = N[-1].indices()
+            tail   = chains[-1]
+            begin  = torch.searchsorted(src, tail)
+            end    = torch.searchsorted(src, tail, right=True)
+            c, a   = sparse.ranges(begin, end)
+            if not len(a): break
+            ijk = torch.cat([chains[:,c], tgt[a][None,:]])
+            Nd = sparse.matrix([Ntot] * (deg + 1), ijk, t=False)
             N += [Nd.coalesce()]
             deg += 1
        
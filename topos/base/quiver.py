@@ -1,7 +1,7 @@
 from .domain    import Domain
 from .sheaf     import Sheaf
 
-from .functor import Functor
+from .functor import Functor, fmap_loop
 from .multigraph import MultiGraph
 
 from topos.core import sparse
@@ -43,6 +43,10 @@ class Quiver(MultiGraph, Functor):
         For fast lookup during `Q.hom(i, j)`, we cache two sparse matrices 
         `Q.begin_hom` and `Q.end_hom` yielding index ranges of the 
         `Q._arrows` tensor. 
+
+        The functor graph is computed by `functor.batch_fmap(arrows)` 
+        when available, e.g. for free functors and functors lifted by 
+        `Graph.quiver()`, and otherwise by calling `functor.fmap` on each arrow.
         """
         keys, arrows = (grades if not isinstance(grades, MultiGraph)
                                else grades.grades)
@@ -80,14 +84,9 @@ class Quiver(MultiGraph, Functor):
         # functor graph
         self.functor = functor
         if not isinstance(functor, type(None)):
-            graphT = []
-            for f in arrows:
-                Tf = functor.fmap(f)
-                src = functor(f[0])
-                N = src.size if 'size' in dir(src) else fp.Torus(src).size
-                gf = Tf(torch.arange(N)) 
-                graphT.append(gf.data)
-            graphT = self[1].field(torch.cat(graphT))
+            graphT = (functor.batch_fmap(arrows) if 'batch_fmap' in dir(functor)
+                      else fmap_loop(functor, arrows))
+            graphT = self[1].field(graphT)
         else:
             graphT = self[1].zeros()
         self.functor_graph = graphT
@@ -1,7 +1,7 @@
 from .domain    import Domain
 
 import topos.io as io
-from topos.core import sparse, linear_cache, Linear
+from topos.core import sparse, segment, linear_cache, Linear, once
 
 import torch
 import fp
@@ -49,6 +49,7 @@ class Sheaf (Domain):
             self.is_sparse, self.adj = False, None
         #--- Fiber index ---
         self.idx, self.keys, fibers = io.readFunctor(keys, functor)
+        self.keyindex = sparse.KeyIndex(self.idx) if self.is_sparse else None
         self.fibers = [f if is_domain(f) else fp.Torus(f) for f in fibers]
         #--- Domain attributes ---
         self.trivial = all(is_trivial(f) for f in self.fibers)
@@ -66,16 +67,15 @@ class Sheaf (Domain):
         """ Index of a key """
         if self.is_sparse:
             key = io.readTensor(key)
-            idx = sparse.select(self.idx, key)
             if output == "mask":
-                mask = sparse.index_mask(self.adj, key)
-                return idx, mask
-            return idx
+                return self.keyindex.find(key)
+            return self.keyindex.select(key)
         else:
             return self.idx[key]
 
     #--- Trivial sheaf --- 
 
+    @once
     def scalars(self):
         """ Trivial sheaf i.e. scalar-valued. """
         if self.is_sparse:
@@ -93,6 +93,11 @@ class Sheaf (Domain):
     
     def from_scalars(self):
         return self.to_scalars().t()
+
+    @once
+    def segments(self):
+        """ Index of the fiber of each entry, for `topos.core.segment`. """
+        return segment.fibers(self.begin, self.end)
     
     #--- Morphisms ---
     
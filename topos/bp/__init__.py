@@ -1,3 +1,4 @@
 from .network import Network
 from .diffusion import BetheDiffusion, GBPDiffusion
+from .schedule import PriorityScheduler
 from .ising import Ising, IsingNetwork
\ No newline at end of file
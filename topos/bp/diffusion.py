@@ -1,4 +1,66 @@
-from topos.core import Smooth,VectorField
+from topos.core import Smooth, VectorField, segment
+from .schedule import PriorityScheduler
+
+import torch
+import warnings
+
+
+def compile_errors():
+    """ 
+    Exceptions raised when `torch.compile` cannot handle a function.
+
+    Errors raised by the function itself are not included.
+    """
+    errors = [ImportError]
+    try:
+        from torch._dynamo import exc
+    except ImportError:
+        return tuple(errors)
+    names = ["BackendCompilerFailed", "InvalidBackend", 
+             "Unsupported", "TritonUnavailableError"]
+    return tuple(errors + [getattr(exc, n) for n in names if hasattr(exc, n)])
+
+
+def compile_step(f, backend="inductor"):
+    """ 
+    Compile a tensor function with `torch.compile`, or run it eagerly.
+
+    Falls back to eager execution, with a warning, if `torch.compile` 
+    is unavailable or if compilation fails on the first call. 
+    Other errors raised by f are propagated. 
+    """
+    if backend is None or not hasattr(torch, "compile"):
+        return f
+    errors = compile_errors()
+    try:
+        compiled = [torch.compile(f, backend=backend)]
+    except errors as e:
+        warnings.warn(f"torch.compile failed, running eagerly: {e!r}")
+        return f
+    def run(x):
+        try:
+            return compiled[0](x)
+        except errors as e:
+            if compiled[0] is f:
+                raise
+            warnings.warn(f"torch.compile failed, running eagerly: {e!r}")
+            compiled[0] = f
+            return f(x)
+    return run
+
+
+def retraction(N, beta=1):
+    """
+    Tensor retraction `h -> h + ln sum exp(-beta * h) / beta` on N[0].
+
+    Each fiber of the (batched) energy h is shifted by its local free
+    energy, broadcast back by a gather along `N[0].segments()`.
+    """
+    idx = N[0].segments()
+    m   = N[0].sizes.shape[0]
+    def r(h):
+        return h + segment.logsumexp(-beta * h, idx, m)[..., idx] / beta
+    return r
 
 
 class Diffusion(VectorField):
@@ -11,10 +73,45 @@ class Diffusion(VectorField):
         def retract(self):
             beta = self.beta if 'beta' in dir(self) else 1
             N = self.network
-            F = lambda x: N.from_scalars(N.freeEnergy(beta)(x))
-            return Smooth(N[0], N[0])(lambda H : H - F(H))
+            r = retraction(N, beta)
+            return Smooth(N[0], N[0])(lambda H: r(H.data))
+
+        def compiled(self, dt, n=1, backend="inductor"):
+            """
+            Euler integrator over raw tensors, retraction included. 
+
+            Returns a function `h -> h'` on (batched) tensors of N[0]
+            performing n steps of `h <- r(h + dt * X(h))`, where X is 
+            the tensor kernel `self.kernel` of the diffusion and r 
+            the retraction. The function is compiled by `compile_step`,
+            with eager execution for `backend=None`.
+            """
+            beta = self.beta if 'beta' in dir(self) else 1
+            N, X = self.network, self.kernel
+            r = retraction(N, beta)
+
+            def step(h):
+                return r(h + dt * X(h))
+            
+            def integrate(h):
+                for k in range(n):
+                    h = step(h)
+                return h
+
+            return compile_step(integrate, backend)
+
+        def prioritized(self, dt, k=1, refresh=100):
+            """
+            Residual-prioritized integrator over raw tensors of N[0].
+
+            Returns a `PriorityScheduler`, mapping `h -> (h, info)` by
+            Euler steps on the k regions of highest residual only.
+            """
+            return PriorityScheduler(self, k, dt, refresh)
 
         setattr(DiffN, "retract", retract)
+        setattr(DiffN, "compiled", compiled)
+        setattr(DiffN, "prioritized", prioritized)
 
         DiffN.__name__ = f'Diffusion {N}'
         return DiffN
@@ -39,6 +136,8 @@ def BetheDiffusion(network, beta=1):
     def diffusion(H):
         return (-1) * delta(D(H))
 
+    diffusion.kernel = lambda h: - delta.matvec(D.kernel(h))
+    diffusion.D, diffusion.delta = D, delta
     return diffusion
    
 
@@ -52,4 +151,6 @@ def GBPDiffusion(network, beta=1):
     def diffusion(H):
         return (-1) * zeta(delta(D(H)))
 
-    return diffusion
\ No newline at end of file
+    diffusion.kernel = lambda h: - zeta.matvec(delta.matvec(D.kernel(h)))
+    diffusion.D, diffusion.delta = D, zeta @ delta
+    return diffusion
@@ -28,7 +28,7 @@ def eigvec(pi):
 def beliefs(pi, pj, eigval):
     Ns = pi.shape[:-1]
     pi, pj = pi.view([-1, 2]), pj.view([-1, 2])
-    sigma = eigval.view([-1]) * gmean(pi) * gmean(pj)
+    sigma = eigval.expand(Ns).reshape([-1]) * gmean(pi) * gmean(pj)
     pij = pi[:,:,None] * pj[:,None,:]
     pij += sigma[:,None,None] * torch.tensor([[1, -1], [-1, 1]])
     return pij.view([*Ns, 2, 2])
@@ -134,9 +134,11 @@ class IsingNetwork(Network):
         G = self._classified
         n0, n1 = G.scalars().sizes[:2]
         s = readTensor(s)
-        if s.numel() == 2:
-            s = torch.cat([s[0].repeat(n0), s[1].repeat(n1)])
         last = [slice(None)] * (s.dim() - 1)
+        if s.shape[-1] == 2 and n0 + n1 != 2:
+            Ns = s.shape[:-1]
+            s = torch.cat([s[(*last, slice(0, 1))].expand(*Ns, n0), 
+                           s[(*last, slice(1, 2))].expand(*Ns, n1)], -1)
         si  = s[(*last, slice(0, n0))]
         sij = s[(*last, slice(n0, None))]
         #--- check shapes
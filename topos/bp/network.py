@@ -2,7 +2,7 @@ import fp
 import torch
 
 from topos.base import Nerve, Domain
-from topos.core import Linear, linear_cache, face
+from topos.core import Linear, linear_cache, face, segment, once
 from topos.core import Smooth, VectorField
 
 def graded_map(method):
@@ -13,10 +13,12 @@ def graded_map(method):
     return run
 
 def temperature_map(method):
-    def run(self, H, beta=1):
+    def run(self, H=None, beta=1, **kwargs):
+        if H is None:
+            return method(self, beta, **kwargs)
         if isinstance(H, (float, int)):
-            return method(self, H)
-        return method(self, beta)(H)
+            return method(self, H, **kwargs)
+        return method(self, beta, **kwargs)(H)
     return run
 
 class Network(Nerve):
@@ -70,11 +72,12 @@ class Network(Nerve):
         They concentrate on minima of H when T goes to 0, 
         i.e. beta goes to infinity.
         """
+        idx = self[d].segments()
+        n   = self[d].sizes.shape[0]
+
         @Smooth(self[d], self[d])
         def gibbs(H):
-            y = self.exp_(d, beta)(H.data)
-            Z = self.to_scalars(d)(y)
-            return y / self.from_scalars(d)(Z)
+            return segment.softmax(- beta * H.data, idx, n)
 
         return gibbs
 
@@ -88,19 +91,22 @@ class Network(Nerve):
     def freeEnergy(self, beta=1):
         """
         Local free energies F: N[0] -> R[0].
+
+            F(H)[a] = - ln sum_a exp(- beta * H[a]) / beta
+
+        Fiber sums are computed as segmented log-sum-exps. 
         """
-        e_  = self.exp_(0, beta)
-        _ln = self.scalars()._ln(0, beta)
-        sum = self.to_scalars(0)
+        idx = self[0].segments()
+        n   = self[0].sizes.shape[0]
 
         @Smooth(self[0], self.scalars()[0])
         def F(H):
-            return _ln(sum(e_(H)))
+            return - segment.logsumexp(- beta * H.data, idx, n) / beta
         
         return F
     
     @temperature_map
-    def freeDiff(self, beta=1):
+    def freeDiff(self, beta=1, fused=True):
         """
         Conditional free energy differences N[0] -> N[1].
 
@@ -122,7 +128,26 @@ class Network(Nerve):
 
         The tangent map TD(H) extends to a differential if on N[.] iff
         local gibbs states are consistent.
+
+        When `fused` (the default), D(H) is computed in a single pass over H 
+        as a gather along face0 and a segmented log-sum-exp along face1
+        (see `Network.face_segments`), also available over raw tensors 
+        as `D.kernel`. Otherwise D is the composite
+        `d0(H) - ln1(d1(e0(H)))` of face maps and pointwise maps.
         """
+        if fused:
+            i0, idx1, src1 = self.face_segments()
+            N1 = self[1].size
+
+            def kernel(h):
+                return h[..., i0] + segment.logsumexp(-beta * h, idx1, N1, src1) / beta
+
+            @Smooth(self[0], self[1])
+            def D(H):
+                return kernel(H.data)
+
+            D.kernel, D.beta = kernel, beta
+            return D
 
         d0, d1 = self.face0(), self.face1()
         e0, ln1 = self.exp_(0, beta), self._ln(1, beta)
@@ -131,8 +156,25 @@ class Network(Nerve):
         def D(H):
             return d0(H) - ln1 (d1(e0(H)))
         
+        D.beta = beta
         return D
 
+    @once
+    def face_segments(self):
+        """
+        Face maps N[0] -> N[1] as segment indices.
+
+        Returns `(i0, idx1, src1)` such that for x in N[0]:
+
+            face0(x) = x[..., i0]
+            face1(x) = segment.sum(x, idx1, N[1].size, src1)
+        """
+        F, k = self.faces(0)
+        F0, F1 = F[:, k == 0], F[:, k == 1]
+        i0 = torch.zeros([self[1].size], dtype=torch.long)
+        i0[F0[0]] = F0[1]
+        return i0, F1[0], F1[1]
+
     @linear_cache('face0')
     def face0(self):
         return super().face(0, 0)
@@ -165,8 +207,7 @@ class Network(Nerve):
 
         @Smooth(self[0], tgt)
         def F_Bethe(H):
-            Fb = (c.data * F(H).data).sum([-1])
-            print(Fb.shape)
+            Fb = (c.data * F(H).data).sum([-1], keepdim=True)
             return tgt.field(Fb)
         
         return F_Bethe
@@ -0,0 +1,181 @@
+from topos.core import sparse, segment
+
+import torch
+import heapq
+
+
+class PriorityScheduler:
+    """
+    Residual-prioritized updates of a diffusion `X(h) = - delta(D(h))`.
+
+    Instead of updating every region of N[0] at each step, the scheduler
+    only updates the `k` regions of highest residual
+
+        r[a] = max |X(h)[a]|
+
+    by an Euler step followed by a retraction on their fibers. The
+    free energy differences D(h) and the vector field X(h) are then
+    patched in place on the 1-chains touching updated regions.
+
+    Regions are selected from a max-heap of residuals, in which only
+    regions touched by a step are pushed again (stale entries being 
+    skipped when popped). Apart from periodic refreshes, the work of 
+    a step is hence proportional to the neighbourhood of updated 
+    regions, up to a logarithmic factor, rather than to the size of 
+    the network.
+
+    The diffusion X should expose its free energy differences as `X.D`
+    and its linear part as `X.delta`, see `BetheDiffusion` and
+    `GBPDiffusion`. Energies are unbatched tensors of N[0].
+    """
+
+    def __init__(self, X, k=1, dt=0.1, refresh=100):
+        N = X.network
+        self.network = N
+        self.k, self.dt, self.refresh = k, dt, refresh
+        self.beta  = X.D.beta
+        self.rbeta = X.beta if 'beta' in dir(X) else 1
+        #--- fibers of N[0]
+        self.begin, self.end = N[0].begin, N[0].end
+        self.regions = N[0].segments()
+        self.m = N[0].sizes.shape[0]
+        #--- face maps of N[1] entries, face1 in row-compressed form
+        i0, idx1, src1 = N.face_segments()
+        n1 = N[1].size
+        order = idx1.argsort(stable=True)
+        self.i0, self.n1 = i0, n1
+        self.f1_ptr = _pointers(idx1, n1)
+        self.f1_src = src1[order]
+        #--- N[1] entries depending on each region
+        ent = torch.cat([torch.arange(n1), idx1])
+        reg = torch.cat([self.regions[i0], self.regions[src1]])
+        keys = torch.unique(reg * n1 + ent)
+        self.dep_ptr = _pointers(torch.div(keys, n1, rounding_mode='floor'), self.m)
+        self.dep = keys % n1
+        #--- linear part delta: N[1] -> N[0] and its columns
+        self.matvec = X.delta.matvec
+        MT = sparse.csr(X.delta.data.t().coalesce())
+        self.crow = MT.crow_indices()
+        self.col  = MT.col_indices()
+        self.val  = MT.values()
+        #--- work of a full synchronous sweep
+        self.sweep = N[0].size + src1.shape[0] + n1 + self.val.shape[0]
+
+    def flux(self, h, E):
+        """ Free energy differences D(h) on the N[1] entries E. """
+        b = self.beta
+        s, p = sparse.ranges(self.f1_ptr[E], self.f1_ptr[E + 1])
+        lse = segment.logsumexp(-b * h[self.f1_src[p]], s, E.shape[0])
+        return h[self.i0[E]] + lse / b, p.shape[0]
+
+    def residuals(self, x, R):
+        """ Residuals of the regions R for the vector field x. """
+        s, p = sparse.ranges(self.begin[R], self.end[R])
+        return segment.max(x[p].abs(), s, R.shape[0])
+
+    def init(self, h):
+        """ Full evaluation of D(h), X(h) and residuals. """
+        E = torch.arange(self.n1)
+        d, _ = self.flux(h, E)
+        x = - self.matvec(d)
+        r = self.residuals(x, torch.arange(self.m))
+        return d, x, r
+
+    def step(self, h, d, x, r, S):
+        """
+        Update the regions S in place.
+
+        Returns the work done and the regions R whose residual changed.
+        """
+        #--- Euler step and retraction on fibers of S
+        s, p = sparse.ranges(self.begin[S], self.end[S])
+        h[p] += self.dt * x[p]
+        lse = segment.logsumexp(-self.rbeta * h[p], s, S.shape[0])
+        h[p] += lse[s] / self.rbeta
+        #--- N[1] entries depending on S
+        _, q = sparse.ranges(self.dep_ptr[S], self.dep_ptr[S + 1])
+        E = torch.unique(self.dep[q])
+        dE, work = self.flux(h, E)
+        dD = dE - d[E]
+        d[E] = dE
+        #--- patch X(h) = - delta(D(h)) along columns E
+        t, c = sparse.ranges(self.crow[E], self.crow[E + 1])
+        cols = self.col[c]
+        x.index_add_(0, cols, - self.val[c] * dD[t])
+        #--- residuals of touched regions
+        R = torch.unique(torch.cat([S, self.regions[cols]]))
+        r[R] = self.residuals(x, R)
+        return p.shape[0] + q.shape[0] + work + c.shape[0] + R.shape[0], R
+
+    def __call__(self, h, tol=1e-6, maxiter=10000):
+        """
+        Iterate prioritized updates until all residuals are below tol.
+
+        Returns `(h, info)` where info holds the number of `iterations`,
+        the final maximal `residual`, the `work` done (in touched entries
+        and heap operations) and its equivalent number of full 
+        synchronous `sweeps`.
+        """
+        h = h.clone()
+        d, x, r = self.init(h)
+        res, heap = self.heap(r)
+        work = self.sweep + self.m
+        for it in range(maxiter):
+            S, pops = self.select(res, heap, tol)
+            work += pops
+            if not len(S):
+                break
+            S = torch.tensor(S)
+            w, R = self.step(h, d, x, r, S)
+            work += w
+            #--- push touched regions
+            for a, ra in zip(R.tolist(), r[R].tolist()):
+                res[a] = ra
+                heapq.heappush(heap, (-ra, a))
+            work += R.shape[0]
+            refresh = self.refresh and (it + 1) % self.refresh == 0
+            if refresh or len(heap) > 4 * self.m:
+                d, x, r = self.init(h)
+                res, heap = self.heap(r)
+                work += self.sweep + self.m
+        else:
+            it = maxiter
+        residual = float(r.max())
+        return h, {"iterations": it,
+                   "residual": residual,
+                   "converged": residual <= tol,
+                   "work": work,
+                   "sweeps": work / self.sweep}
+
+    def heap(self, r):
+        """ Residuals as a list and a max-heap of `(-r[a], a)` pairs. """
+        res = r.tolist()
+        heap = [(-ra, a) for a, ra in enumerate(res)]
+        heapq.heapify(heap)
+        return res, heap
+
+    def select(self, res, heap, tol):
+        """ 
+        Pop up to k distinct regions of residual above tol.
+
+        Returns the selected regions and the number of pops.
+        """
+        S, pops = [], 0
+        while heap and len(S) < self.k:
+            nr, a = heap[0]
+            if -nr <= tol:
+                break
+            heapq.heappop(heap)
+            pops += 1
+            if res[a] == -nr:
+                S.append(a)
+                res[a] = None
+        for a in S:
+            res[a] = 0.
+        return S, pops
+
+
+def _pointers(idx, n):
+    """ Row pointers of sorted segment indices `idx` into n segments. """
+    counts = torch.bincount(idx, minlength=n)
+    return torch.cat([counts.new_zeros([1]), counts.cumsum(0)])
@@ -1,12 +1,18 @@
 from .shape  import Shape
 from .vect   import Vect
 from .sparse import *
+from .       import segment
 from .topology import *
 from .field  import Field
 from .linear import Linear
+from .fft    import FFT
+from .triangular import TriangularInverse
+from .subsets import SubsetTransform
+from .lazy   import Gram
 from .eigen  import Eigen
+from .buffer import Buffer
 from .smooth import Smooth, VectorField
-from .cache  import linear_cache
+from .cache  import linear_cache, persist, store
 from .functional import Functional, GradedFunctional
 from .graded import Graded
 from .once   import once
\ No newline at end of file
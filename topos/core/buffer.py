@@ -0,0 +1,118 @@
+import torch
+import json
+import math
+import os
+
+
+class Buffer:
+    """
+    Bounded record of iteration samples.
+
+    Samples are stored in a tensor of shape `[size, *shape]`, allocated
+    on the first sample, and overwritten cyclically once full, so that
+    the buffer holds the last `size` samples.
+
+    When `path` is given, the storage is a memory-mapped file of
+    `size * prod(shape)` entries, preallocated on disk with the row-major
+    layout of the buffer: sample n lives in slot `n % size`. Alongside
+    it are written:
+        - `{path}.steps`: a memory-mapped int64 tensor of size `size + 1`
+          holding the sample count, followed by the iteration number
+          of each slot,
+        - `{path}.json`: the layout `{size, shape, dtype}` of samples.
+    so that records can be read back in order by `Buffer.open(path)`.
+    """
+
+    def __init__(self, size, path=None):
+        if size < 1:
+            raise ValueError(f"Buffer size should be positive, got {size}")
+        self.size  = size
+        self.path  = path
+        self.data  = None
+        self.count = 0
+        if path is None:
+            self.header = torch.full([size + 1], -1, dtype=torch.long)
+        else:
+            self.header = torch.from_file(path + ".steps", shared=True, 
+                                          size=size + 1, dtype=torch.long)
+            self.header.fill_(-1)
+        self.header[0] = 0
+        self.steps = self.header[1:]
+
+    @classmethod
+    def open(cls, path):
+        """ 
+        Reopen a memory-mapped buffer written at path. 
+
+        Buffers created without samples have no layout yet, and are 
+        reopened empty.
+        """
+        size = os.path.getsize(path + ".steps") // 8 - 1
+        buf = object.__new__(cls)
+        buf.size, buf.path, buf.data = size, path, None
+        buf.header = torch.from_file(path + ".steps", shared=True, 
+                                     size=size + 1, dtype=torch.long)
+        buf.steps = buf.header[1:]
+        buf.count = int(buf.header[0])
+        if not os.path.exists(path + ".json"):
+            return buf
+        with open(path + ".json") as f:
+            layout = json.load(f)
+        shape = layout["shape"]
+        dtype = getattr(torch, layout["dtype"].split(".")[-1])
+        n = size * math.prod(shape)
+        data = torch.from_file(path, shared=True, size=n, dtype=dtype)
+        buf.data = data.view([size, *shape])
+        return buf
+
+    def allocate(self, y):
+        """ Preallocate storage for samples like y. """
+        shape = [self.size, *y.shape]
+        if self.path is None:
+            return torch.empty(shape, dtype=y.dtype, device=y.device)
+        with open(self.path + ".json", "w") as f:
+            json.dump({"size": self.size, "shape": list(y.shape), 
+                       "dtype": str(y.dtype)}, f)
+        n = self.size * y.numel()
+        data = torch.from_file(self.path, shared=True, size=n, dtype=y.dtype)
+        return data.view(shape)
+
+    def append(self, y, step=None):
+        """ Record a sample, overwriting the oldest one when full. """
+        y = y.data if not isinstance(y, torch.Tensor) and 'data' in dir(y) else y
+        y = torch.as_tensor(y)
+        if self.data is None:
+            self.data = self.allocate(y)
+        i = self.count % self.size
+        self.data[i] = y
+        self.steps[i] = self.count if step is None else step
+        self.count += 1
+        self.header[0] = self.count
+
+    def order(self):
+        """ Slots of recorded samples, from oldest to newest. """
+        n = len(self)
+        start = self.count - n
+        return torch.arange(start, self.count) % self.size
+
+    def values(self):
+        """ Recorded samples, from oldest to newest. """
+        if self.data is None:
+            return torch.tensor([])
+        return self.data[self.order()]
+
+    def iterations(self):
+        """ Iteration numbers of recorded samples, from oldest to newest. """
+        return self.steps[self.order()]
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def __getitem__(self, i):
+        return self.values()[i]
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def __repr__(self):
+        return f"Buffer {len(self)}/{self.size}"
@@ -1,8 +1,279 @@
 from .field  import Field
 from .linear import Linear
+from .once   import once
+from .       import sparse
 import torch
 import fp
 
+from collections import OrderedDict
+import hashlib
+import tempfile
+import time
+import os
+
+#--- Persistent storage
+
+_directory = os.environ.get("TOPOS_CACHE", None)
+
+def persist(directory=None):
+    """
+    Store cached operators in `directory` (or stop storing if None).
+
+    Operators computed by `linear_cache` are then saved to disk,
+    keyed by a content hash of their domain (see `fingerprint`), and 
+    memory-mapped back on later runs instead of being recomputed.
+    The directory may also be set by the `TOPOS_CACHE` environment 
+    variable.
+    """
+    global _directory
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    _directory = directory
+
+def _bytes(x):
+    if isinstance(x, torch.Tensor):
+        head = f'{x.dtype}{list(x.shape)}'.encode()
+        return head + x.contiguous().cpu().numpy().tobytes()
+    return repr(x).encode()
+
+@once
+def fingerprint(domain):
+    """
+    Content hash of the grades and functor shapes of a domain.
+
+    For nerves, the classified graph and its quiver are also hashed
+    (keys, forgotten labels and functor graph), as they determine
+    the restriction maps behind zeta, mu and the differentials. 
+    """
+    h = hashlib.sha256(type(domain).__name__.encode())
+    if 'grades' in dir(domain):
+        grades = domain.grades
+        fibers = [f for Gd in domain.fibers for f in Gd.fibers]
+    else:
+        grades = [domain.keys]
+        fibers = domain.fibers
+    for g in grades:
+        h.update(_bytes(g))
+    h.update(repr([tuple(getattr(f, 'shape', [f.size])) for f in fibers]).encode())
+    K = getattr(domain, '_classified', None)
+    if K is not None:
+        for g in K.grades:
+            h.update(_bytes(g))
+        Q = getattr(domain, '_quiver', None)
+        for attr in ('forgotten', 'functor_graph'):
+            x = getattr(Q, attr, None)
+            if x is not None:
+                h.update(_bytes(getattr(x, 'data', x)))
+    return h.hexdigest()
+
+def _domains(self):
+    """ Yield (path, domain) pairs reachable from self. """
+    graded = 'grades' in dir(self)
+    yield (), self
+    if graded:
+        for k, Fk in enumerate(self.fibers):
+            yield (k,), Fk
+    if 'scalars' in dir(self):
+        O = self.scalars()
+        yield ("scalars",), O
+        if graded:
+            for k, Ok in enumerate(O.fibers):
+                yield ("scalars", k), Ok
+
+def _locate(self, D):
+    for path, Dp in _domains(self):
+        if Dp is D:
+            return list(path)
+
+def _resolve(self, path):
+    D = self
+    for p in path:
+        D = D.scalars() if p == "scalars" else D[p]
+    return D
+
+def _path(self, name, d):
+    key = f'{fingerprint(self)}-{name}-{d}'
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return os.path.join(_directory, digest + '.pt')
+
+def save(self, name, d, op):
+    """ 
+    Save a cached operator to the cache directory. 
+
+    Operators that cannot be stored (lazy operators, or operators 
+    between domains not reachable from self) are flagged as `_skip`,
+    so that later cache hits do not try again.
+    """
+    if getattr(op, 'lazy', False):
+        op._skip = True
+        return
+    src = _locate(self, op.src.domain)
+    tgt = _locate(self, op.tgt.domain)
+    if src is None or tgt is None:
+        op._skip = True
+        return
+    data = op.data.coalesce() if op.data.is_sparse else op.data
+    entry = {"src": src, "tgt": tgt, 
+             "degree": op.degree,
+             "name" : op.__name__,
+             "size" : list(data.shape)}
+    if data.is_sparse:
+        entry["indices"], entry["values"] = data.indices(), data.values()
+    else:
+        entry["data"] = data
+    path = _path(self, name, d)
+    with tempfile.NamedTemporaryFile(dir=_directory, suffix='.tmp', 
+                                     delete=False) as f:
+        torch.save(entry, f)
+    os.replace(f.name, path)
+    op._stored = True
+
+def load(self, name, d):
+    """ Memory-map a cached operator from the cache directory. """
+    path = _path(self, name, d)
+    if not os.path.exists(path):
+        return None
+    entry = torch.load(path, mmap=True, weights_only=True)
+    if "data" in entry:
+        data = entry["data"]
+    else:
+        data = torch.sparse_coo_tensor(
+                    entry["indices"], entry["values"], entry["size"],
+                    is_coalesced=True)
+    src = _resolve(self, entry["src"])
+    tgt = _resolve(self, entry["tgt"])
+    op = Linear(src, tgt)(data, entry["degree"], entry["name"])
+    op._stored = True
+    return op
+
+#--- Memory budget and statistics
+
+_budget = None
+_lru    = OrderedDict()
+_bytes_used = 0
+_stats  = {}
+_deps   = {}
+
+def nbytes(op):
+    """ 
+    Bytes of storage of a cached value.
+
+    Sparse operators count their COO indices and values, along with 
+    the compressed sparse row copy they keep once applied (see 
+    `Linear.csr`), whether or not it was already built. Apply-only 
+    operators count their own storage (see e.g. `Gram.nbytes`), 
+    tuples and lists the sum of their items. 
+    """
+    if isinstance(op, (tuple, list)):
+        return sum(nbytes(x) for x in op)
+    if isinstance(op, torch.Tensor):
+        return sparse.nbytes(op)
+    if not isinstance(op, fp.Linear) and callable(getattr(op, 'nbytes', None)):
+        return op.nbytes()
+    data = op.data
+    if data.is_sparse:
+        data = data.coalesce()
+        idx, val = data.indices(), data.values()
+        nnz, rows = val.numel(), data.shape[0]
+        coo = idx.numel() * idx.element_size() + nnz * val.element_size()
+        csr = ((rows + 1 + nnz) * idx.element_size() 
+               + nnz * val.element_size())
+        return coo + csr
+    return data.numel() * data.element_size()
+
+def budget(size=None):
+    """
+    Bound cached operators of the process to `size` bytes (None for no bound).
+
+    Operators are evicted in least recently used order 
+    once the budget is exceeded. 
+    """
+    global _budget
+    _budget = size
+    if size is None:
+        _lru.clear()
+        _deps.clear()
+    _evict()
+
+def stats(name=None):
+    """
+    Cache statistics per operator name. 
+
+    Counts hits, misses and evictions, along with build time 
+    in seconds and bytes of cached operators (net of evictions).
+    """
+    if name is not None:
+        return dict(_stats.get(name, _stat()))
+    return {k: dict(v) for k, v in _stats.items()}
+
+def reset_stats():
+    """ Reset cache statistics. """
+    _stats.clear()
+
+def _stat():
+    return {"hits": 0, "misses": 0, "evictions": 0, "time": 0., "bytes": 0}
+
+def _track(cache, name, op, size=None):
+    """ Record a cached operator in least recently used order. """
+    global _bytes_used
+    key = (id(cache), name)
+    if key in _lru:
+        _lru.move_to_end(key)
+        return
+    counted = size is not None
+    size = size if counted else nbytes(op)
+    _lru[key] = (cache, name, op, size, counted)
+    _bytes_used += size
+    _evict()
+
+def _evict():
+    global _bytes_used
+    if _budget is None:
+        _bytes_used = 0
+        return
+    while _bytes_used > _budget and len(_lru) > 1:
+        _, (cache, name, op, size, counted) = _lru.popitem(last=False)
+        if cache.get(name) is op:
+            del cache[name]
+        stat = _stats.setdefault(name, _stat())
+        stat["evictions"] += 1
+        stat["bytes"] -= size if counted else 0
+        _bytes_used -= size
+        _drop(cache, name)
+
+def _drop(cache, name):
+    """ Drop entries derived from an evicted entry, recursively. """
+    global _bytes_used
+    for c, n in _deps.pop((id(cache), name), []):
+        if n not in c:
+            continue
+        del c[n]
+        stat = _stats.setdefault(n, _stat())
+        stat["evictions"] += 1
+        entry = _lru.pop((id(c), n), None)
+        if entry is not None:
+            _bytes_used -= entry[3]
+            stat["bytes"] -= entry[3] if entry[4] else 0
+        _drop(c, n)
+
+def store(cache, name, value, after=()):
+    """
+    Store a value in a domain cache, tracked like `linear_cache` entries.
+
+    The value is counted in the statistics and memory budget. 
+    `after` lists `(cache, name)` entries the value is derived from, 
+    e.g. a Möbius transform built from zeta: when a budget is set
+    and one of them is evicted, the value is dropped as well.
+    """
+    cache[name] = value
+    size = nbytes(value)
+    _stats.setdefault(name, _stat())["bytes"] += size
+    if _budget is not None:
+        for c, n in after:
+            _deps.setdefault((id(c), n), []).append((cache, name))
+        _track(cache, name, value, size)
+    return value
+
 #--- Cached operators
 
 def linear_cache (name, symbol=None):
@@ -13,6 +284,13 @@ def linear_cache (name, symbol=None):
     a method with prototypes:
         - `op : D -> Functional(D, D')` to compute or read `op` from cache
         - `op : Field(D) -> Field(D')` applied to arguments. 
+
+    Cached operators keep a compressed sparse row copy of their 
+    matrix, converted on first application (see `Linear.csr`).
+    When a cache directory is set (see `persist`), operators 
+    are also read from and written to disk. When a memory budget 
+    is set (see `budget`), least recently used operators are evicted. 
+    Hits, misses and build times are recorded (see `stats`).
     """
     if type(symbol) == type(None): 
         symbol = name
@@ -27,15 +305,34 @@ def linear_cache (name, symbol=None):
             #-- Read/write cache
             if name in cache:
                 op = cache[name]
+                _stats.setdefault(name, _stat())["hits"] += 1
+                if _budget is not None:
+                    _track(cache, name, op)
             else:
-                op = operator(self) if deg else operator(self, d) 
-                op.__name__ = symbol
+                t0 = time.perf_counter()
+                op = load(self, name, d) if _directory else None
+                if op is None:
+                    op = operator(self) if deg else operator(self, d) 
+                    op.__name__ = symbol
+                # the operator may have stored itself, e.g. `Nerve.zetas`
+                stored = cache.get(name) is op
                 cache[name] = op
+                stat = _stats.setdefault(name, _stat())
+                stat["misses"] += 1
+                stat["time"]   += time.perf_counter() - t0
+                if not stored:
+                    size = nbytes(op)
+                    stat["bytes"] += size
+                    if _budget is not None:
+                        _track(cache, name, op, size)
+            if (_directory and not getattr(op, '_stored', False)
+                           and not getattr(op, '_skip', False)):
+                save(self, name, d, op)
             #-- Apply to x / return op
             if isinstance(x, self.Field(d)):
-                return op @ x.data
+                return op.tgt(op.matvec(x.data))
             elif isinstance(x, torch.Tensor):
-                return op.tgt.field(op.data @ x)
+                return op.tgt.field(op.matvec(x))
             elif isinstance(x, fp.Tensor):
                 return op(x)
             return op
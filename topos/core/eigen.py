@@ -1,4 +1,5 @@
 from .linear import Linear
+from .       import sparse
 
 import fp
 import torch
@@ -80,12 +81,86 @@ class Eigen:
     def elements(cls, A, rank=None, log2N=32):
         """
         Return dominant eigenvectors and eigenvalues. 
+
+        Eigenpairs of largest absolute value are computed by `Eigen.lobpcg`
+        at both ends of the spectrum, without squaring A. 
+        The `log2N` argument is kept for compatibility.
         """
-        n = A.shape[0]
+        n = cls.size(A)
         rank = n if type(rank) == type(None) else rank
-        vecs, vals, B = [], [], A
-        for k in range(rank):
-            xi, vi, B = cls.split(B, log2N)
-            vecs.append(xi)
-            vals.append(vi)
-        return torch.stack(vecs), torch.stack(vals)
\ No newline at end of file
+        if 3 * rank >= n:
+            M = A if isinstance(A, torch.Tensor) else A.data
+            M = M.to_dense() if M.is_sparse else M
+            vals, vecs = torch.linalg.eigh(M.float())
+            vecs, vals = vecs.T, vals
+        else: 
+            top, vtop = cls.lobpcg(A, rank, largest=True)
+            bot, vbot = cls.lobpcg(A, rank, largest=False)
+            vecs, vals = torch.cat([top, bot]), torch.cat([vtop, vbot])
+        order = vals.abs().sort(descending=True).indices[:rank]
+        return vecs[order], vals[order]
+
+    @staticmethod
+    def size(A):
+        """ Dimension of the space acted on by A. """
+        if isinstance(A, torch.Tensor):
+            return A.shape[-1]
+        if isinstance(getattr(A, 'size', None), int):
+            return A.size
+        return A.data.shape[-1]
+
+    @staticmethod
+    def matvec(A):
+        """ Product by A on blocks of row vectors of shape [k, n]. """
+        if isinstance(A, torch.Tensor):
+            return lambda X: sparse.matvec(A, X)
+        return A.matvec
+
+    @classmethod
+    def lobpcg(cls, A, k=1, largest=True, X=None, tol=1e-5, maxiter=500):
+        """
+        Extreme eigenpairs of a symmetric operator, by block LOBPCG.
+
+        Only products by A are used (see `Linear.matvec`), so that sparse 
+        operators and lazy operators (e.g. `Complex.laplacian_lazy`) are never 
+        squared nor materialized. Returns a pair `(vecs, vals)` of the k 
+        largest (or smallest) eigenvalues, with eigenvectors as rows of 
+        `vecs`. Eigenvectors of a previous call may be passed as `X` 
+        of shape [k', n] to warm start the iteration. 
+
+        References:
+        -----------
+        - Knyazev, 2001:
+            Toward the Optimal Preconditioned Eigensolver: Locally Optimal 
+            Block Preconditioned Conjugate Gradient Method
+        """
+        n, apply = cls.size(A), cls.matvec(A)
+        sign = 1. if largest else -1.
+        #--- initial block
+        X0 = torch.randn([k, n])
+        if X is not None:
+            X = torch.as_tensor(X, dtype=torch.float)
+            X = X.reshape([-1, n])[:k]
+            X0[:X.shape[0]] = X
+        X = torch.linalg.qr(X0.T).Q
+        AX = sign * apply(X.T).T.float()
+        P = None
+        for it in range(maxiter):
+            #--- Rayleigh-Ritz on span(X)
+            theta = (X * AX).sum(0)
+            R = AX - X * theta
+            res = R.norm(dim=0)
+            if (res <= tol * theta.abs().max().clamp(min=1)).all():
+                break
+            #--- Rayleigh-Ritz on span(X, R, P)
+            S = torch.cat([X, R] if P is None else [X, R, P], 1)
+            Q = torch.linalg.qr(S).Q
+            AQ = sign * apply(Q.T).T.float()
+            T = Q.T @ AQ
+            w, V = torch.linalg.eigh((T + T.T) / 2)
+            V = V[:, -k:].flip(1)
+            X, AX = Q @ V, AQ @ V
+            P = Q[:, k:] @ V[k:]
+        theta = (X * AX).sum(0)
+        order = theta.sort(descending=True).indices
+        return X[:, order].T, sign * theta[order]
@@ -0,0 +1,81 @@
+from .shape  import Shape
+from .field  import Field
+from .once   import once
+from .       import sparse
+
+import torch
+import fp
+
+class FFT:
+    """
+    Fourier transform on a torus, applied with `torch.fft`.
+
+    The operator acts on (batched) row-major vectors of size `shape.size`
+    and agrees with the sparse matrices of `sparse.Fourier(shape)` and
+    `sparse.iFourier(shape)`, which are kept as a reference path:
+
+        FFT(shape)(x)               == F  @ x
+        FFT(shape, inverse=True)(x) == iF @ x
+
+    The forward transform is normalized by `1 / shape.size`, 
+    so that the inverse transform does not rescale. 
+
+    Fields are mapped to complex valued fields of the target `FFT.tgt`,
+    over the torus of `shape` (batched fields to batched fields).
+    """
+
+    def __init__(self, shape, inverse=False, name=None):
+        if not isinstance(shape, Shape):
+            shape = Shape(*[int(n) for n in shape])
+        self.shape   = shape
+        self.size    = shape.size
+        self.inverse = inverse
+        self.degree  = 0
+        self.src = self.tgt = Field(fp.Torus(shape.n))
+        self.__name__ = name if name else ('iF' if inverse else 'F')
+
+    def matvec(self, x):
+        """ Apply the transform to the last dimension of x. """
+        Ns, dims = x.shape[:-1], tuple(range(-self.shape.dim, 0))
+        y = x.reshape([*Ns, *self.shape.n])
+        if self.inverse:
+            y = torch.fft.ifftn(y, dim=dims, norm="forward")
+        else:
+            y = torch.fft.fftn(y, dim=dims, norm="forward")
+        return y.reshape([*Ns, self.size])
+
+    def __call__(self, x):
+        """ Action on numerical data, or fields with complex values. """
+        if isinstance(x, torch.Tensor):
+            return self.matvec(x)
+        y = self.matvec(x.data)
+        if y.dim() > 1:
+            return self.tgt.batched(*y.shape[:-1])(y)
+        return self.tgt(y)
+
+    def __matmul__(self, other):
+        return self(other)
+
+    def t(self):
+        """ Transposed operator (Fourier matrices are symmetric). """
+        return self
+
+    def inv(self):
+        """ Inverse transform. """
+        return FFT(self.shape, not self.inverse)
+
+    @once
+    def to_sparse(self):
+        """ Reference sparse matrix, from `sparse.Fourier`. """
+        ij, Fij = (sparse.iFourier(self.shape) if self.inverse 
+                                               else sparse.Fourier(self.shape))
+        N = self.size
+        return sparse.matrix([N, N], ij, Fij, t=False).coalesce()
+
+    @property
+    def data(self):
+        return self.to_sparse()
+
+    def __repr__(self):
+        return f"FFT {self.__name__} {self.shape}"
+
@@ -0,0 +1,132 @@
+from .field  import Field
+from .linear import Linear
+from .once   import once
+from .       import sparse
+
+import torch
+import fp
+
+class Gram:
+    """
+    Lazy sum of squares, e.g. Hodge Laplacians:
+
+        L = sum [A.t() @ A for A in As]
+
+    The domain of L is read from the factors, or from `domain` 
+    if there are none, in which case L is null.
+
+    L is applied factor by factor and only materialized by `to_sparse`,
+    as the product may have many more nonzeros than its factors. 
+
+    Gram operators act on (batched) fields and numerical data. 
+    Composition with other operators goes through the materialized 
+    `Linear` operator (see `Gram.linear`). 
+
+    When fused, factors are stacked into a single CSR matrix 
+    `A = [A0; A1; ...]` so that `L x = A.t() @ (A @ x)` takes two sparse 
+    products. Otherwise, each term is applied through its own CSR matrices.
+    """
+
+    lazy = True
+
+    def __init__(self, As, name=None, fused=True, domain=None):
+        self.As     = As
+        self.src = self.tgt = As[0].src if len(As) else Field(domain)
+        self.size   = self.src.domain.size
+        self.degree = 0
+        self.fused  = fused
+        self.__name__ = name if name else 'L'
+
+    @once
+    def factors(self):
+        """ CSR factors [(A, A.t()), ...], stacked if fused. """
+        mats = [sparse.coo(A.data) for A in self.As]
+        if self.fused and len(mats):
+            rows = torch.tensor([0] + [M.shape[0] for M in mats]).cumsum(0)
+            ij = torch.cat([M.indices() + torch.tensor([[r], [0]]) 
+                            for M, r in zip(mats, rows)], 1)
+            val = torch.cat([M.values() for M in mats])
+            shape = [int(rows[-1]), self.size]
+            mats = [sparse.matrix(shape, ij, val, t=False).coalesce()]
+        return [(sparse.csr(M), sparse.csr(M.t())) for M in mats]
+
+    def matvec(self, x):
+        """ Apply L to the last dimension of x. """
+        y = torch.zeros_like(x)
+        for A, At in self.factors():
+            y = y + sparse.matvec(At, sparse.matvec(A, x))
+        return y
+
+    def __call__(self, x):
+        """ Action on (batched) numerical data or fields. """
+        if isinstance(x, torch.Tensor):
+            return self.matvec(x)
+        y = self.matvec(x.data)
+        if y.dim() > 1:
+            return self.tgt.batched(*y.shape[:-1])(y)
+        return self.tgt(y)
+
+    def __matmul__(self, other):
+        """ Composition with operators, or action on fields. """
+        if isinstance(other, Gram):
+            other = other.linear()
+        if isinstance(other, fp.Arrow):
+            return self.linear() @ other
+        return self(other)
+
+    def __rmatmul__(self, other):
+        """ Composition on the left by operators. """
+        return other @ self.linear()
+
+    def linear(self):
+        """ Materialized operator, as a `Linear` instance. """
+        D = self.src.domain
+        return Linear(D, D)(self.to_sparse(), self.degree, self.__name__)
+
+    def t(self):
+        """ Transposed operator (L is symmetric). """
+        return self
+
+    def cost(self):
+        """
+        Cost estimate of L.
+
+        Returns a dictionary with:
+            - "matvec":  multiply-adds per (unbatched) application of L
+            - "nnz":     nonzeros stored by the factors
+            - "product": upper bound on the nonzeros of the materialized L
+        """
+        nnz, bound = 0, 0
+        for A in self.As:
+            M = sparse.coo(A.data)
+            rows = torch.bincount(M.indices()[0], minlength=M.shape[0])
+            nnz   += M._nnz()
+            bound += int((rows ** 2).sum())
+        return {"matvec": 2 * nnz, 
+                "nnz": nnz, 
+                "product": min(bound, self.size ** 2)}
+
+    def nbytes(self):
+        """ Bytes of CSR storage of the factors. """
+        total = 0
+        for A, At in self.factors():
+            for M in (A, At):
+                total += sum(t.numel() * t.element_size() for t in 
+                             (M.crow_indices(), M.col_indices(), M.values()))
+        return total
+
+    @once
+    def to_sparse(self):
+        """ Materialized operator, as a sum of sparse products. """
+        mats = [sparse.coo(A.data) for A in self.As]
+        out  = sparse.zero(self.size, self.size)
+        for M in mats:
+            out = out + sparse.matmul(M.t(), M)
+        return out.coalesce()
+
+    @property
+    def data(self):
+        return self.to_sparse()
+
+    def __repr__(self):
+        return f"Gram {self.__name__}"
@@ -2,6 +2,8 @@ from .functional import Functional, GradedFunctional
 from .vect import Vect
 from .field import Field
 from .sparse import eye, zero, matmul, diag
+from .once   import once
+from .       import sparse
 
 from topos.io import LinearError
 
@@ -40,6 +42,35 @@ class Linear(fp.Linear):
                 d, name = self.degree, self.__name__ + '*'
                 return Linear(B, A)(self.data.t(), d, name)
 
+            @once
+            def csr(self):
+                """ 
+                Compressed sparse row copy of the matrix, computed once.
+                """
+                return sparse.csr(self.data)
+
+            def matvec(self, x):
+                """
+                Apply the operator to (batched) numerical data.
+
+                Products go through the CSR copy of the matrix.
+                """
+                return sparse.matvec(self.csr(), x)
+
+            def __call__(self, x):
+                """
+                Action on (batched) fields.
+
+                Batched inputs of shape [..., n] are mapped by a single
+                sparse product through `matvec`.
+                """
+                data = x if isinstance(x, torch.Tensor) else getattr(x, 'data', None)
+                if (isinstance(data, torch.Tensor) and not data.is_sparse
+                        and data.dim() > 1):
+                    y = self.matvec(data)
+                    return self.tgt.batched(*y.shape[:-1])(y)
+                return super().__call__(x)
+
             def __truediv__(self, other): 
                 """ 
                 Divide coefficients by numerical data (e.g. scalar).
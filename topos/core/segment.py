@@ -0,0 +1,57 @@
+"""
+Segmented reductions.
+
+Values `x[..., i]` of a (batched) field are reduced into segments
+`out[..., idx[i]]` with scatter kernels, leading dimensions of `x` being
+understood as batch dimensions. 
+
+Segments are either the fibers `[begin[k], end[k])` of a sheaf, 
+see `fibers`, or given by the graph `(idx, src)` of an index map, 
+in which case `x[..., src]` is reduced into `out[..., idx]`. 
+"""
+import torch
+
+from .sparse import ranges
+
+#--- Segment indices ---
+
+def fibers(begin:torch.LongTensor, end:torch.LongTensor) -> torch.LongTensor:
+    """ Segment index of each entry for contiguous fibers `[begin, end)`. """
+    return ranges(begin, end)[0]
+
+def _gather(x, idx, n, src):
+    if src is not None:
+        x = x[..., src]
+    if n is None:
+        n = int(idx.max()) + 1 if idx.numel() else 0
+    return x, idx.expand(*x.shape[:-1], idx.shape[0]), n
+
+#--- Reductions ---
+
+def sum(x:torch.Tensor, idx:torch.LongTensor, n:int=None, src=None) -> torch.Tensor:
+    """ Sum of values over segments. """
+    x, index, n = _gather(x, idx, n, src)
+    out = x.new_zeros([*x.shape[:-1], n])
+    return out.scatter_add_(-1, index, x)
+
+def max(x:torch.Tensor, idx:torch.LongTensor, n:int=None, src=None) -> torch.Tensor:
+    """ Maximum of values over segments, `-inf` on empty segments. """
+    x, index, n = _gather(x, idx, n, src)
+    out = x.new_full([*x.shape[:-1], n], float('-inf'))
+    return out.scatter_reduce_(-1, index, x, 'amax', include_self=False)
+
+def logsumexp(x:torch.Tensor, idx:torch.LongTensor, n:int=None, src=None) -> torch.Tensor:
+    """
+    Numerically stable `log(sum(exp(x)))` over segments.
+
+    Segment maxima are subtracted before exponentiation. 
+    """
+    x, index, n = _gather(x, idx, n, src)
+    m = max(x, idx, n)
+    m = torch.where(torch.isfinite(m), m, torch.zeros_like(m))
+    s = sum(torch.exp(x - m[..., idx]), idx, n)
+    return m + torch.log(s)
+
+def softmax(x:torch.Tensor, idx:torch.LongTensor, n:int=None) -> torch.Tensor:
+    """ Normalized exponentials `exp(x) / sum(exp(x))` over segments. """
+    return torch.exp(x - logsumexp(x, idx, n)[..., idx])
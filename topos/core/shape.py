@@ -1,26 +1,66 @@
 import torch
 
+def div(a, b):
+    return torch.div(a, b, rounding_mode='floor')
+
+#--- Batched row-major indexing ---
+
+def strides(ns):
+    """ Row-major strides of (batched) shapes `ns` of shape [..., d]. """
+    ones = torch.ones_like(ns[..., :1])
+    tail = torch.cat([ns[..., 1:], ones], -1)
+    return tail.flip(-1).cumprod(-1).flip(-1)
+
+def ravel(x, ns):
+    """ Row-major index of coordinates `x` in (batched) shapes `ns`. """
+    return (x * strides(ns)).sum([-1])
+
+def unravel(i, ns):
+    """ Coordinates of row-major index `i` in (batched) shapes `ns`. """
+    x = div(i[..., None], strides(ns))
+    x[..., 1:] %= ns[..., 1:]
+    return x
+
+def expand(ds, x):
+    """ Broadcast a [N, k] tensor of dimensions against coordinates x. """
+    while ds.dim() < x.dim():
+        ds = ds.unsqueeze(-2)
+    return ds.expand(*x.shape[:-1], ds.shape[-1])
+
+
 class Shape:
+    """
+    Row-major shapes, with batched index <-> coordinates maps.
 
-    def __init__(self, *ns):
+    Shapes are interned, i.e. equal shapes are the same instance
+    and share their precomputed int64 strides.
+    """
+
+    _shapes = {}
+
+    def __new__(cls, *ns):
 
         if not all(isinstance(ni, (int, torch.LongTensor)) for ni in ns):
             raise TypeError("Expecting integer arguments")
-        
-        self.dim = len(ns)
-        self.n = list(ns)
-        self.ns = torch.tensor(self.n)
-        self.mod = torch.tensor([
-            torch.prod(self.ns[i+1:]) for i in range(self.dim)
-        ])
-        self.rmod = torch.tensor([
-            torch.prod(self.ns[:-i]) for i in range(self.dim)
-        ])
-        
-        size = 1
-        for ni in ns:
-            size *= ni
-        self.size = size
+
+        n = tuple(int(ni) for ni in ns)
+        if n in cls._shapes:
+            return cls._shapes[n]
+
+        shape = object.__new__(cls)
+        shape.dim = len(n)
+        shape.n = list(n)
+        shape.ns = torch.tensor(shape.n, dtype=torch.long)
+        shape.mod = strides(shape.ns)
+        prods = torch.cat([torch.ones([1], dtype=torch.long),
+                           shape.ns.cumprod(0)])
+        shape.rmod = torch.cat([prods[:1], prods[1:shape.dim].flip(0)])
+        shape.size = int(prods[-1])
+        cls._shapes[n] = shape
+        return shape
+
+    def __init__(self, *ns):
+        pass
 
     def index(self, *js):
         """ Row-major index of coordinates js.
@@ -34,66 +74,77 @@ class Shape:
         j0 = js[0]
         js = (j0 if isinstance(j0, torch.Tensor) and j0.dim() >= 1
                  else torch.tensor(js))
-        return (self.mod * js).sum([-1]) 
+        return (self.mod * js).sum([-1])
 
     def coords(self, i):
         """ Returns coordinates of row-major index.
 
                 i :: int | tensor(dtype=long)
+
+            Tensor inputs of shape [...] yield coordinates
+            of shape [..., dim].
         """
         if isinstance(i, int):
             if i >= self.size or i < 0:
                 raise IndexError(f"{self} coords {i}")
-
-        div = lambda a, b: torch.div(a, b, rounding_mode = 'floor')
-        
-        i = (torch.tensor(i) if not isinstance(i, torch.Tensor)
-             else i + 0)
-        
-        if i.dim() == 0:
-            out = torch.zeros([self.dim], dtype=torch.long)
-            for j, mj in enumerate(self.mod):
-                out[j] = div(i, mj)
-                i      = i % mj
-            return out
-
-        out = []
-        for j, mj in enumerate(self.mod):
-            out += div(i[None,:], mj)
-            i    = i % mj
-        return (torch.stack(out).t() if len(out) 
-                                     else torch.tensor([[]]))
-            
+        i = torch.as_tensor(i, dtype=torch.long)
+        x = div(i[..., None], self.mod)
+        x[..., 1:] %= self.ns[1:]
+        return x
 
     def p(self, d):
         def proj_d(i):
             x = self.coords(i)
-            return x[d]
+            return x[..., d]
         return proj_d
 
     def res(self, *ds):
+        """
+        Index map i -> j to the restricted shape over dimensions ds.
+
+        The dimensions ds may also be given as a [N, k] tensor,
+        restricting each index of a batch of shape [N] or [N, M]
+        to its own choice of dimensions.
+        """
+        if len(ds) == 1 and isinstance(ds[0], torch.Tensor) and ds[0].dim() == 2:
+            ds = ds[0]
+            def res_batch(i):
+                x = self.coords(i)
+                dx = expand(ds, x)
+                return ravel(x.gather(-1, dx), self.ns[dx])
+            return res_batch
+
+        tgt = Shape(*[self.n[d] for d in ds])
+        ds  = torch.tensor([int(d) for d in ds], dtype=torch.long)
         def res_index(i):
-            x   = self.coords(i)
-            tgt = Shape(*[self.n[d] for d in ds])
-            return tgt.index(*[x[d] for d in ds])
+            x = self.coords(i)
+            return tgt.index(x[..., ds])
         return res_index
 
     def embed(self, *ds):
-        mat = torch.zeros([self.dim, len(ds)], dtype=torch.long)
-        for i, d in enumerate(ds):
-            mat[d, i] = 1
+        """
+        Index map j -> i from coordinates over dimensions ds.
+
+        Coordinates of shape [k] yield an integer index,
+        batched coordinates of shape [..., k] yield a tensor of indices.
+        The dimensions ds may also be given as a [N, k] tensor.
+        """
+        if len(ds) == 1 and isinstance(ds[0], torch.Tensor) and ds[0].dim() == 2:
+            ds = ds[0]
+        else:
+            ds = torch.tensor([int(d) for d in ds], dtype=torch.long)
         def emb_index(x):
-            y = (mat @ x if x.dim() == 1. 
-                         else (mat @ x.T).T)
-            return int(self.index(y))
+            y = torch.zeros([*x.shape[:-1], self.dim], dtype=torch.long)
+            y.scatter_(-1, expand(ds, x), x.long())
+            out = self.index(y)
+            return int(out) if out.dim() == 0 else out
         return emb_index
 
     def __iter__(self):
         return self.n.__iter__()
-    
-    def __str__(self): 
+
+    def __str__(self):
         return "(" + ",".join([str(ni) for ni in self.n]) + ")"
 
-    def __repr__(self): 
+    def __repr__(self):
         return f"Shape {self}"
-
@@ -2,8 +2,10 @@ import fp
 
 from .field  import Field
 from .linear import Linear
+from .buffer import Buffer
 
 from contextlib import contextmanager
+import os
 
 class Smooth (fp.Arrow):
     
@@ -70,26 +72,129 @@ class VectorField:
                 """ Explicit Euler integrator. """
                 return lambda x: x + dt * self(x)
 
+            def converge(self, dt, tol=1e-6, maxiter=1000, method='euler',
+                         residual=None, adaptive=False, energy=None, etol=1e-4):
+                """
+                Integrate until the residual falls below `tol`.
+
+                Returns a function `x0 -> (x, info)` where `info` holds 
+                the number of `"iterations"`, the final `"residual"`, 
+                the size `"dt"` of the last step taken (None if none was),
+                the step size `"dt_next"` proposed for a further step 
+                and whether `"converged"`.
+
+                The residual defaults to the norm of the vector field, 
+                and may be replaced by any callable `x -> float`, e.g. 
+                a consistency residual. Batched inputs use the maximal 
+                residual. 
+
+                When `adaptive`, the step size is chosen by:
+                    - backtracking on `energy` if given, halving dt 
+                      until the energy decreases, 
+                    - step doubling otherwise, comparing one step 
+                      of dt with two steps of dt/2 up to `etol`.
+                Accepted steps grow dt by 1.5 up to its initial value. 
+                """
+                steps = {}
+                def step(h):
+                    if h not in steps:
+                        if len(steps) > 32: 
+                            steps.clear()
+                        steps[h] = getattr(self, method)(h, 1, write=False)
+                    return steps[h]
+
+                def norm(x):
+                    return float(x.data.norm(dim=-1).max())
+
+                res = residual if residual else (lambda x: norm(self(x)))
+                total = (lambda x: float(energy(x).data.sum()))
+                dt_min = dt * 2 ** -20
+
+                def adaptive_step(x, h):
+                    if energy is not None:
+                        E = total(x)
+                        y = step(h)(x)
+                        while total(y) > E and h > dt_min:
+                            h = h / 2
+                            y = step(h)(x)
+                        return y, h
+                    while True:
+                        y1 = step(h)(x)
+                        y2 = step(h / 2)(step(h / 2)(x))
+                        if norm(y2 - y1) <= etol or h <= dt_min:
+                            return y2, h
+                        h = h / 2
+
+                def run(x0):
+                    x, h, k = x0 + 0, dt, 0
+                    used = None
+                    r = res(x)
+                    while r > tol and k < maxiter:
+                        for w, every in self._writers:
+                            if k % every == 0:
+                                w(x, k)
+                        if adaptive:
+                            x, used = adaptive_step(x, h)
+                            h = min(dt, 1.5 * used)
+                        else:
+                            x, used = step(h)(x), h
+                        k += 1
+                        r = res(x)
+                    info = {"iterations": k, "residual": r, 
+                            "dt": used, "dt_next": h, "converged": r <= tol}
+                    return x, info
+
+                return run
+
             @contextmanager
-            def write(self, **callbacks):
-                out = {k: [] for k in callbacks}
-                self._writers = ([
-                    (lambda x, _: out[k].append(fk(x)))
-                                for k, fk in callbacks.items()])
+            def write(self, callbacks, every=1, size=None, path=None):
+                """
+                Record callback values during integration.
+
+                Callbacks are given as a dictionary `{key: x -> value}`.
+                Yields a dictionary of records, one per key,
+                sampled every `every` iterations:
+                    - lists of values by default, 
+                    - `Buffer` instances holding the last `size` values
+                      when `size` is given, 
+                    - memory-mapped buffers preallocated on disk as 
+                      `{path}/{key}.bin` when `path` is also given, 
+                      which `Buffer.open` reads back.
+                """
+                if path is not None and size is None:
+                    raise ValueError("Memory-mapped records need a size")
+                if path is not None:
+                    os.makedirs(path, exist_ok=True)
+                out = {}
+                for key in callbacks:
+                    file = os.path.join(path, f"{key}.bin") if path else None
+                    out[key] = [] if size is None else Buffer(size, file)
+                def record(key, fk):
+                    if size is None:
+                        return lambda x, n: out[key].append(fk(x))
+                    return lambda x, n: out[key].append(fk(x), n)
+                writers = self._writers
+                self._writers = writers + [
+                    (record(key, fk), every) for key, fk in callbacks.items()]
                 try:
                     yield out
                 finally:
-                    self._writers = []
+                    self._writers = writers
 
-            def writer(self, callback):
+            def writer(self, callback=None, every=1):
                 """ 
                 Use as decorator to append an iteration callback.
 
                 The writer will be called as `callback(x, n)` where:
                     - `x` is the vector field argument,
                     - `n` is the current iteration number. 
+
+                With `every=k`, the writer is only called on iterations
+                that are multiples of k, e.g. `@X.writer(every=10)`.
                 """
-                self._writers.append(callback)
+                if callback is None:
+                    return lambda callback: self.writer(callback, every)
+                self._writers.append((callback, every))
                 return callback
         
         VecA.__name__ = f'VectorField {A}'
@@ -106,7 +211,7 @@ class VectorField:
     @classmethod   
     def integrator(cls, method):
 
-        def loop_method(self, dt, n=1):
+        def loop_method(self, dt, n=1, write=True):
 
             src = self.src.domain
 
@@ -115,11 +220,12 @@ class VectorField:
             @Smooth(src, src)
             def integrate(x0):
                 x = x0 + 0
+                writers = self._writers if write else []
                 for k in range(n):
                     #--- writers ---
-                    if len(self._writers):
-                        for w in self._writers:
-                            w(x, n)
+                    for w, every in writers:
+                        if k % every == 0:
+                            w(x, k)
                     #--- step ---
                     x = step(x)
                 return x
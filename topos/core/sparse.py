@@ -4,22 +4,72 @@ import torch
 from math import pi
 
 def matmul (A, B):
-    """ Sparse matmul, accepting complex input. """
-    mm = torch.sparse.mm
+    """ 
+    Sparse matmul, accepting complex input.
 
-    if not(torch.is_complex(A) or torch.is_complex(B)):
-        return mm(A, B)
+    Mixed real and complex operands are promoted to a common dtype, 
+    so that complex products run in a single `torch.sparse.mm` call.
+    """
+    A, B = promote(A, B)
+    AB = torch.sparse.mm(A, B)
+    return AB.coalesce() if AB.layout == torch.sparse_coo else AB
+
+def promote (A, B):
+    """ Cast operands to a common dtype. """
+    dtype = torch.promote_types(A.dtype, B.dtype)
+    return (A if A.dtype == dtype else A.to(dtype),
+            B if B.dtype == dtype else B.to(dtype))
+
+def matvec (A, x):
+    """
+    Apply a sparse matrix (COO or CSR) to the last dimension of x.
 
-    A, iA = from_complex(A)
-    B, iB = from_complex(B)
-    real = (mm(A, B)  - mm(iA, iB)).coalesce()
-    imag = (mm(A, iB) + mm(iA,  B)).coalesce()
+    Leading dimensions of x are understood as batch dimensions.
+    """
+    A, x = promote(A, x)
+    if x.dim() == 1:
+        return A @ x
+    Ns = x.shape[:-1]
+    y = A @ x.reshape([-1, x.shape[-1]]).T
+    return y.T.reshape([*Ns, A.shape[0]])
+
+#--- Compressed formats ---
+
+def nbytes (*ts):
+    """ Bytes of storage of (sparse COO or CSR) tensors. """
+    total = 0
+    for t in ts:
+        if t.layout == torch.sparse_coo:
+            parts = (t._indices(), t._values())
+        elif t.layout == torch.sparse_csr:
+            parts = (t.crow_indices(), t.col_indices(), t.values())
+        else:
+            parts = (t,)
+        total += sum(p.numel() * p.element_size() for p in parts)
+    return total
+
+def is_csr (A):
+    """ Whether A is stored in compressed sparse row format. """
+    return A.layout == torch.sparse_csr
+
+def csr (A):
+    """
+    Compressed sparse row copy of a sparse matrix.
 
-    return matrix(
-        [A.shape[0], B.shape[1]],
-        torch.cat([real.indices().t(), imag.indices().t()]),
-        torch.cat([real.values().cfloat(), 1j * imag.values().cfloat()]),
-    ).coalesce()
+    Row pointers are sorted once and for all, so that repeated
+    products skip the coalescing work done on COO tensors.
+    """
+    if is_csr(A):
+        return A
+    if not A.is_sparse:
+        return A.to_sparse_csr()
+    return A.coalesce().to_sparse_csr()
+
+def coo (A):
+    """ Coalesced COO copy of a sparse matrix. """
+    if is_csr(A):
+        return A.to_sparse_coo().coalesce()
+    return A.coalesce()
 
 #--- Constructors ---
 
@@ -66,6 +116,10 @@ def index_select(g:torch.Tensor, idx:torch.LongTensor, dim:int = 0) -> torch.Ten
     """ Select slices from a sparse matrix.
 
         Equivalent to `g.index_select(dim, idx)` but much faster.
+
+        Slices are located by binary search of row pointers in the 
+        sorted indices of g, so that the cost is linear in the 
+        number of selected nonzeros.
     """
     if not g.is_coalesced(): return index_select(g.coalesce(), idx, dim)
 
@@ -73,50 +127,108 @@ def index_select(g:torch.Tensor, idx:torch.LongTensor, dim:int = 0) -> torch.Ten
     values  = g.values()
   
     if dim != 0:
-        sorting = indices[dim].sort().indices
+        sorting = indices[dim].sort(stable=True).indices
         indices = indices[:,sorting]
         values  = values[sorting]
 
-    # degree of the nodes
-    deg_g = (torch.zeros(g.shape[dim], dtype=torch.int32, device=indices.device)
-                  .scatter_(0, indices[dim], 1, reduce="add"))
-  
-    # slice start indices
-    query     = torch.arange(g.shape[dim], dtype=torch.long)
-    slice_begin = torch.bucketize(query, indices[dim])
-  
-    # edge indices mapped within shape N x max(deg_g)
-    edges = (torch.arange(deg_g.max(), dtype=torch.long)
-                .unsqueeze(0)
-                .repeat(g.shape[dim], 1))
-    mask = edges < deg_g[:,None]
-    edges += slice_begin[:,None]
+    # slice begin and end pointers
+    rows  = indices[dim].contiguous()
+    begin = torch.searchsorted(rows, idx)
+    end   = torch.searchsorted(rows, idx, right=True)
+
+    # edge indices of the concatenated slices
+    slc, edges = ranges(begin, end)
 
     # return stacked slices
     shape = [*g.shape[:dim], idx.shape[0], *g.shape[dim + 1:]]
-    val   = values[edges[idx][mask[idx]]]
-    ij    = indices[:, edges[idx][mask[idx]]]
-    ij[dim] = torch.arange(shape[dim]).repeat_interleave(deg_g[idx])
+    val   = values[edges]
+    ij    = indices[:, edges]
+    ij[dim] = slc
     return torch.sparse_coo_tensor(ij, val, size=shape).coalesce()
 
+def ranges(begin:torch.LongTensor, end:torch.LongTensor) -> tuple:
+    """ 
+    Concatenated integer ranges `[begin[k], end[k])`.
+
+    Returns a pair `(k, i)` of tensors of size `(end - begin).sum()`,
+    labeling each integer `i` by the index `k` of its range.
+    """
+    lengths = end - begin
+    k   = torch.arange(lengths.shape[0], device=begin.device)
+    k   = k.repeat_interleave(lengths)
+    off = lengths.cumsum(0) - lengths
+    i   = torch.arange(k.shape[0], device=begin.device) - off[k] + begin[k]
+    return k, i
+
 #--- Efficient access to values
 
+class KeyIndex:
+    """
+    Sorted flat keys of a sparse tensor.
+
+    A key index is built once from a sparse tensor `x` and answers 
+    batched key -> position and key membership queries by binary search
+    on the row-major keys of `x`, without coalescing or flattening `x` 
+    again. 
+
+    Query keys are coordinates of shape `[N, x.dim()]` (or `[x.dim()]` 
+    for a single key), or flat keys of shape `[N]` when `x.dim() == 1`.
+    """
+
+    def __init__(self, x:torch.Tensor):
+        if not x.is_coalesced():
+            x = x.coalesce()
+        self.shape  = Shape(*x.shape)
+        indices     = x.indices()
+        self.keys   = (indices[0] if x.dim() == 1 
+                                  else self.shape.index(indices.T))
+        self.keys   = self.keys.contiguous()
+        self.values = x.values()
+
+    def flat(self, idx:torch.LongTensor) -> torch.LongTensor:
+        """ Row-major flat keys of coordinates. """
+        if self.shape.dim > 1:
+            return self.shape.index(idx)
+        return idx.view([-1]) if idx.dim() > 1 else idx
+
+    def search(self, key:torch.LongTensor) -> tuple:
+        """ Positions `pos` and membership `mask` of flat keys. """
+        n = self.keys.shape[0]
+        if n == 0:
+            pos = torch.zeros_like(key)
+            return pos, pos != 0
+        pos  = torch.searchsorted(self.keys, key).clamp(max=n - 1)
+        mask = self.keys[pos] == key
+        return pos, mask
+
+    def find(self, idx:torch.LongTensor) -> tuple:
+        """ Values at coordinates, with membership mask. """
+        pos, mask = self.search(self.flat(idx))
+        if not self.values.numel():
+            return torch.zeros_like(pos, dtype=self.values.dtype), mask
+        return mask * self.values[pos], mask
+
+    def select(self, idx:torch.LongTensor) -> torch.Tensor:
+        """ Values at coordinates, zero outside of the support. """
+        return self.find(idx)[0]
+
+    def mask(self, idx:torch.LongTensor) -> torch.BoolTensor:
+        """ Membership of coordinates in the support. """
+        return self.search(self.flat(idx))[1]
+
+    def __repr__(self):
+        return f"KeyIndex {self.shape} ({self.keys.shape[0]} keys)"
+
+
 def select(x:torch.Tensor, idx:torch.LongTensor) -> torch.Tensor:
-    """ Select pointwise values from a sparse tensor. """
-    if x.dim() > 1:
-        shape  = Shape(*[ni for ni in x.shape])
-        x_flat = reshape([-1], x)
-        return select(x_flat, shape.index(idx))
-    if idx.dim() > 1:
-        idx = idx.view([-1])
-    if not x.is_coalesced():
-        x = x.coalesce()
-    supp = x.indices().flatten()
-    val  = x.values()
-    pos  = torch.bucketize(idx, supp)
-    pos  = torch.min(pos, torch.tensor(supp.shape[0] - 1))
-    mask = (supp[pos] == idx)
-    return mask * val[pos]
+    """ 
+    Select pointwise values from a sparse tensor. 
+
+    The sparse tensor `x` may be replaced by a persistent `KeyIndex`.
+    """
+    if not isinstance(x, KeyIndex):
+        x = KeyIndex(x)
+    return x.select(idx)
       
 #--- Filtering indices
 
@@ -126,19 +238,12 @@ def index_mask(x:torch.Tensor, idx:torch.LongTensor) -> torch.BoolTensor:
       
     Returns a vector of size `idx.shape[0]`,
     assuming `idx.shape[1] == x.dim()`.
+
+    The sparse tensor `x` may be replaced by a persistent `KeyIndex`.
     """
-    if (not x.dim() == 1) and idx.dim() == 1:
-        return index_mask(x, idx.unsqueeze(0))[0]
-    if not (x.dim() == 1 and idx.dim() == 1):
-        x_flat = reshape([-1], x).coalesce()
-        idx_flat = Shape(*x.shape).index(idx)
-        return index_mask(x_flat, idx_flat)
-    indices = x.indices().flatten()
-    # Closest position of index in the indices of x.
-    pos = torch.bucketize(idx, indices)
-    pos = torch.min(pos, torch.tensor(indices.shape[0] - 1))
-    # Check that indices match
-    return idx == indices[pos]
+    if not isinstance(x, KeyIndex):
+        x = KeyIndex(x)
+    return x.mask(idx)
 
 #--- Sum slices
 
@@ -0,0 +1,87 @@
+from .field  import Field
+from .       import sparse
+
+import torch
+
+def yates(x, m, inverse=False):
+    """
+    Zeta (or Möbius) transform over subsets of an m-element set.
+
+    The last dimension of x, of size 2^m, is indexed by bitmasks
+    of subsets. The zeta transform sums over subsets:
+
+        y[a] = sum [x[b] | b <= a]
+
+    and is computed in place in m butterfly steps, i.e. O(m 2^m) 
+    operations instead of the 3^m nonzeros of its matrix. 
+    """
+    Ns = x.shape[:-1]
+    for k in range(m):
+        y = x.view([*Ns, 2 ** (m - k - 1), 2, 2 ** k])
+        if inverse:
+            y[..., 1, :] -= y[..., 0, :]
+        else:
+            y[..., 1, :] += y[..., 0, :]
+    return x
+
+
+class SubsetTransform:
+    """
+    Zeta (or Möbius) transform of a downward closed hypergraph.
+
+    The transform is local to maximal regions. Each table `T` 
+    of shape [R, 2^m] lists the indices of subsets of R maximal 
+    regions of cardinal m, by bitmask (-1 for missing subsets, 
+    e.g. the empty set). Values are gathered by table, transformed
+    by `yates` and scattered back. 
+
+    This operator is apply-only: its transpose and matrix are read
+    from the sparse operator returned by `sparse()`.
+    """
+
+    def __init__(self, tables, size, inverse=False, domain=None, 
+                 name=None, sparse=None):
+        self.tables  = tables
+        self.size    = size
+        self.inverse = inverse
+        self.degree  = 0
+        self.src = self.tgt = Field(domain) if domain is not None else None
+        self.domain  = domain
+        self.sparse  = sparse
+        self.__name__ = name if name else ('μ' if inverse else 'ζ')
+
+    def matvec(self, x):
+        """ Apply the transform to the last dimension of x. """
+        Ns = x.shape[:-1]
+        xp = torch.cat([x, torch.zeros([*Ns, 1], dtype=x.dtype)], -1)
+        out = torch.zeros_like(x)
+        for m, T in self.tables:
+            X = yates(xp[..., T], m, self.inverse)
+            mask = T >= 0
+            out[..., T[mask]] = X[..., mask]
+        return out
+
+    def __call__(self, x):
+        """ Action on numerical data or fields. """
+        if isinstance(x, torch.Tensor):
+            return self.matvec(x)
+        tgt = self.tgt if self.tgt is not None else x.__class__
+        return tgt(self.matvec(x.data))
+
+    def __matmul__(self, other):
+        return self(other)
+
+    def nbytes(self):
+        """ Bytes of the subset tables. """
+        return sparse.nbytes(*[T for m, T in self.tables])
+
+    def t(self):
+        """ Transposed operator, from the sparse operator. """
+        return self.sparse().t()
+
+    @property
+    def data(self):
+        return self.sparse().data
+
+    def __repr__(self):
+        return f"SubsetTransform {self.__name__}"
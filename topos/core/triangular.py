@@ -0,0 +1,148 @@
+from .field  import Field
+from .once   import once
+from .       import sparse
+
+import torch
+
+def levels(A):
+    """
+    Topological levels of a unitriangular sparse matrix A.
+
+    The level of i is the length of the longest path i -> j -> ... 
+    along off-diagonal nonzero entries A[i, j]. 
+    Entries of A only connect rows to columns of lower levels.
+    """
+    A = A.coalesce()
+    n = A.shape[0]
+    i, j = A.indices()
+    off = i != j
+    i, j = i[off], j[off]
+    lvl = torch.zeros([n], dtype=torch.long)
+    for _ in range(n):
+        new = torch.zeros([n], dtype=torch.long)
+        new.scatter_reduce_(0, i, lvl[j] + 1, 'amax')
+        if torch.equal(new, lvl):
+            return lvl
+        lvl = new
+    raise ValueError("Matrix is not triangular")
+
+
+class TriangularInverse:
+    """
+    Inverse of a unitriangular sparse matrix, applied by forward substitution.
+
+    Rows of A are sorted by topological level (see `levels`), 
+    so that `A x = y` is solved with one sparse product per level, 
+    without forming the inverse matrix:
+
+        x[R0] = y[R0]
+        x[Rk] = y[Rk] - N[Rk, R<k] @ x[R<k]     for k = 1, ..., depth
+
+    where `N = A - Id` only reads rows of lower levels. The inverse 
+    matrix is computed by the same ordered elimination in `to_sparse`.
+    """
+
+    def __init__(self, A, domain=None, name=None):
+        A = A.coalesce()
+        n = A.shape[0]
+        self.A      = A
+        self.size   = n
+        self.degree = 0
+        self.src = self.tgt = Field(domain) if domain is not None else None
+        self.domain = domain
+        self.__name__ = name if name else 'A⁻¹'
+        #--- sort rows by level
+        lvl   = levels(A)
+        order = lvl.argsort(stable=True)
+        pos   = torch.empty_like(order)
+        pos[order] = torch.arange(n)
+        bounds = torch.searchsorted(lvl[order], torch.arange(2 + int(lvl.max())))
+        #--- strictly triangular part in level order
+        i, j = A.indices()
+        off  = i != j
+        i, j, v = pos[i[off]], pos[j[off]], A.values()[off]
+        s = (n * i + j).argsort()
+        i, j, v = i[s], j[s], v[s]
+        crow = torch.cat([torch.zeros([1], dtype=torch.long),
+                          torch.bincount(i, minlength=n).cumsum(0)])
+        #--- blocks N[Rk, R<k] 
+        self.order  = order
+        self.bounds = bounds.tolist()
+        self.blocks = []
+        for a, b in self.levels():
+            c0, c1 = int(crow[a]), int(crow[b])
+            Nk = torch.sparse_csr_tensor(crow[a:b+1] - c0, j[c0:c1], v[c0:c1], 
+                                         (b - a, a))
+            self.blocks.append(Nk)
+
+    def levels(self):
+        """ Yield (begin, end) row ranges of levels k > 0 in level order. """
+        return zip(self.bounds[1:-1], self.bounds[2:])
+
+    def matvec(self, y):
+        """ Solve `A x = y` on the last dimension of y. """
+        x = y[..., self.order].clone()
+        for (a, b), Nk in zip(self.levels(), self.blocks):
+            x[..., a:b] -= sparse.matvec(Nk, x[..., :a])
+        out = torch.empty_like(x)
+        out[..., self.order] = x
+        return out
+
+    def __call__(self, x):
+        """ Action on numerical data or fields. """
+        if isinstance(x, torch.Tensor):
+            return self.matvec(x)
+        tgt = self.tgt if self.tgt is not None else x.__class__
+        return tgt(self.matvec(x.data))
+
+    def __matmul__(self, other):
+        return self(other)
+
+    def t(self):
+        """ Transposed operator, inverting the transpose of A. """
+        name = self.__name__ + '*'
+        return TriangularInverse(self.A.t(), self.domain, name)
+
+    def nbytes(self):
+        """ Bytes of the level blocks and of the inverse, if computed. """
+        total = sparse.nbytes(self.order, *self.blocks)
+        if '_to_sparse' in dir(self):
+            total += sparse.nbytes(self._to_sparse)
+        return total
+
+    @once
+    def to_sparse(self):
+        """ 
+        Inverse matrix, by ordered elimination. 
+
+        Rows of the inverse are computed level by level from rows
+        of lower levels, as `X[Rk] = Id[Rk] - N[Rk, R<k] @ X[R<k]`.
+        """
+        n, dtype = self.size, self.A.dtype
+        b0 = self.bounds[1]
+        I  = torch.arange(b0)
+        X  = torch.sparse_csr_tensor(torch.arange(b0 + 1), I, 
+                                     torch.ones([b0], dtype=dtype), (b0, n))
+        for (a, b), Nk in zip(self.levels(), self.blocks):
+            P = torch.sparse.mm(Nk, X).to_sparse_coo()
+            r = torch.arange(b - a)
+            Xk = torch.sparse_coo_tensor(
+                    torch.cat([torch.stack([r, a + r]), P.indices()], 1),
+                    torch.cat([torch.ones([b - a], dtype=dtype), -P.values()]),
+                    (b - a, n)).coalesce().to_sparse_csr()
+            X = torch.sparse_csr_tensor(
+                    torch.cat([X.crow_indices(), 
+                               X.crow_indices()[-1] + Xk.crow_indices()[1:]]),
+                    torch.cat([X.col_indices(), Xk.col_indices()]),
+                    torch.cat([X.values(), Xk.values()]), (b, n))
+        #--- back to original order 
+        X = X.to_sparse_coo()
+        i, j = self.order[X.indices()]
+        return sparse.matrix([n, n], torch.stack([i, j]), X.values(), t=False).coalesce()
+
+    @property
+    def data(self):
+        return self.to_sparse()
+
+    def __repr__(self):
+        return f"TriangularInverse {self.__name__}"